@@ -1,17 +1,22 @@
-from flask import Flask
+from dotenv import load_dotenv
+
+# Load environment variables from .env file before any module reads its settings at import
+load_dotenv()
+
+from flask import Flask, Response
 from flask_cors import CORS
 from routes.items import items_bp
 from routes.users import users_bp
-from routes.auth import auth_bp
+from routes.auth import auth_bp, login_required
 from routes.shelf_life import shelf_life_bp
 from routes.openai import openai_bp
 from flask_mail import Mail, Message
-from dotenv import load_dotenv
 import os
 from routes.recipes import recipes_bp
-
-# Load environment variables from .env file
-load_dotenv()
+from services.database import init_app as init_database, pool_stats
+from services import metrics, sql_trace
+from services.cache import cache_stats
+from services.edamam import search_stats as edamam_search_stats
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}}, supports_credentials=True)
@@ -29,6 +34,15 @@ app.config['OPENAI_API_KEY'] = os.getenv('OPENAI_API_KEY')
 
 mail = Mail(app)
 
+# Return pooled database connections at the end of every request
+init_database(app)
+
+# Per-route request latency, counts and in-flight requests for /metrics
+metrics.init_app(app)
+
+# Opt-in per-request SQL statement log (SQL_TRACE=True)
+sql_trace.init_app(app)
+
 # Register blueprints
 app.register_blueprint(items_bp)
 app.register_blueprint(users_bp)
@@ -42,6 +56,23 @@ app.register_blueprint(openai_bp)
 def home():
     return "Hello, Flask is working!"
 
+# Database connection pool statistics, for signed-in users only
+@app.route('/db_pool_stats')
+@login_required
+def db_pool_stats():
+    return {"pools": pool_stats()}
+
+# Cache hit/miss statistics, for signed-in users only
+@app.route('/cache_stats')
+@login_required
+def get_cache_stats():
+    return {"caches": cache_stats(), "edamam_search": edamam_search_stats()}
+
+# Prometheus metrics: request, database and outbound call latencies
+@app.route('/metrics')
+def get_metrics():
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 # Error handling for 500 - Internal Server Error
 @app.errorhandler(500)
 def internal_error(e):
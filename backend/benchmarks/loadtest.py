@@ -0,0 +1,297 @@
+"""
+End-to-end load test: seed a database, start the Edamam/OpenAI stand-ins, serve
+the app and drive a weighted mix of requests across every blueprint, then report
+throughput and latency percentiles per scenario.
+
+Run from the backend directory:
+
+    python -m benchmarks.loadtest --users 50 --concurrency 16 --duration 30
+
+By default the app is served in this process by a threaded Werkzeug server, which
+shares the GIL with the load driver; for production-like numbers, start the stubs
+(python -m benchmarks.stubs) and gunicorn against a seeded database yourself and
+pass --target http://127.0.0.1:5000 --no-seed.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import requests
+from benchmarks.seed import DEFAULT_PASSWORD, ITEMS, seed, username
+from benchmarks.stubs import start_stub
+
+PERCENTILES = (50, 90, 95, 99)
+
+SHELF_LIFE_LOCATIONS = ('pantry', 'fridge', 'freezer')
+SEARCH_TERMS = ('chicken', 'beef', 'salmon', 'pasta', 'rice', 'tofu', 'spinach', 'eggs', 'beans', 'tomato')
+RECIPE_TITLES = ('Chicken Skillet 1', 'Beef Stir-Fry 2', 'Salmon Bowl 3', 'Veggie Soup 4', 'Egg Bake 5', 'Rice Curry 6')
+INGREDIENT_LINES = ('2 cups all-purpose flour', '3 large eggs, beaten', '1 lb chicken breast, diced',
+                    '1/2 cup shredded cheddar cheese', '2 tbsp olive oil', '1 can diced tomatoes')
+
+
+# Each scenario makes the calls a user action makes and returns the last response.
+# A scenario succeeds when that response is below 400 or one of its accepted statuses
+# (e.g. 404 for an empty list).
+
+def login(client):
+    return client.login()
+
+
+def login_status(client):
+    return client.get('/login_status')
+
+
+def inventory(client):
+    return client.get('/inventory_items')
+
+
+def grocery_list(client):
+    return client.get('/grocery_items')
+
+
+def add_item(client):
+    name, category, location = client.rng.choice(ITEMS)
+    return client.post('/items', {"item_name": name, "category": category, "quantity": client.rng.randint(1, 4),
+                                  "in_list": 1, "location": location})
+
+
+def transfer(client):
+    response = add_item(client)
+    if response.status_code != 201:
+        return response
+    return client.post('/transfer_to_inventory', {"item_ids": [response.json()['item_id']]})
+
+
+def shelf_life(client):
+    name = client.rng.choice(ITEMS)[0]
+    return client.get('/shelf_life', params={"name": name, "location": client.rng.choice(SHELF_LIFE_LOCATIONS)})
+
+
+def shelf_life_batch(client):
+    return client.post('/shelf_life/batch', {})
+
+
+def recipe_search(client):
+    terms = client.rng.sample(SEARCH_TERMS, client.rng.randint(1, 2))
+    return client.post('/meals_generated', {"items": [{"item_name": term} for term in terms]})
+
+
+def saved_recipes(client):
+    return client.get('/recipe_items')
+
+
+def fetch_ingredients(client):
+    return client.post('/fetch_ingredients_batch', {"titles": client.rng.sample(RECIPE_TITLES, 3)})
+
+
+def classify(client):
+    names = [client.rng.choice(ITEMS)[0] for _ in range(3)] + [f"specialty item {client.rng.randrange(500)}"]
+    return client.post('/classify_items', {"item_names": names})
+
+
+def clean_ingredients(client):
+    return client.post('/clean_ingredients', {"ingredients": list(INGREDIENT_LINES)})
+
+
+# name -> (default weight, scenario, statuses that count as success besides 2xx)
+SCENARIOS = {
+    "login": (2, login, ()),
+    "login_status": (3, login_status, ()),
+    "inventory": (20, inventory, (404,)),
+    "grocery_list": (12, grocery_list, (404,)),
+    "add_item": (8, add_item, ()),
+    "transfer": (5, transfer, ()),
+    "shelf_life": (12, shelf_life, (404,)),
+    "shelf_life_batch": (4, shelf_life_batch, ()),
+    "recipe_search": (6, recipe_search, (404,)),
+    "saved_recipes": (5, saved_recipes, (404,)),
+    "fetch_ingredients": (3, fetch_ingredients, ()),
+    "classify": (5, classify, ()),
+    "clean_ingredients": (3, clean_ingredients, ()),
+}
+
+
+class Client:
+    """One simulated user: a logged-in requests session against the app under test."""
+
+    def __init__(self, base_url, user, password, rng, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.user = user
+        self.password = password
+        self.rng = rng
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def get(self, path, params=None):
+        return self.session.get(self.base_url + path, params=params, timeout=self.timeout)
+
+    def post(self, path, payload):
+        return self.session.post(self.base_url + path, json=payload, timeout=self.timeout)
+
+    def login(self):
+        return self.post('/login', {"username": self.user, "password": self.password})
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(samples, elapsed):
+    """Per-scenario and overall counts, errors, throughput and latency percentiles in milliseconds."""
+    groups = {}
+    for name, latency, ok in samples:
+        groups.setdefault(name, []).append((latency, ok))
+    groups["TOTAL"] = [(latency, ok) for _, latency, ok in samples]
+
+    report = {}
+    for name, values in groups.items():
+        latencies = sorted(latency * 1000 for latency, _ in values)
+        report[name] = {
+            "requests": len(values),
+            "errors": sum(1 for _, ok in values if not ok),
+            "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            **{f"p{pct}_ms": round(percentile(latencies, pct), 2) for pct in PERCENTILES},
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0
+        }
+    return report
+
+
+def print_report(report, elapsed, concurrency):
+    columns = ["requests", "errors", "throughput_rps", "mean_ms"] + [f"p{pct}_ms" for pct in PERCENTILES] + ["max_ms"]
+    print(f"\n{elapsed:.1f}s with {concurrency} concurrent users")
+    print(f"{'scenario':<18}" + ''.join(f"{column:>15}" for column in columns))
+    for name in sorted(report, key=lambda name: (name == "TOTAL", name)):
+        print(f"{name:<18}" + ''.join(f"{report[name][column]:>15}" for column in columns))
+
+
+def run_load(base_url, users, password, scenarios, concurrency, duration, warmup, timeout, random_seed):
+    """
+    Drive `concurrency` simulated users for `warmup` + `duration` seconds; only
+    requests started after the warm-up are recorded. Returns (samples, elapsed).
+    """
+    names = list(scenarios)
+    weights = [scenarios[name][0] for name in names]
+    samples = []
+    samples_lock = threading.Lock()
+    start = time.perf_counter()
+    measure_from = start + warmup
+    deadline = measure_from + duration
+
+    def simulate(index):
+        rng = random.Random(random_seed + index)
+        client = Client(base_url, rng.choice(users), password, rng, timeout)
+        client.login()
+        while True:
+            began = time.perf_counter()
+            if began >= deadline:
+                return
+            name = rng.choices(names, weights)[0]
+            accepted = scenarios[name][2]
+            try:
+                status = scenarios[name][1](client).status_code
+                ok = status < 400 or status in accepted
+            except requests.exceptions.RequestException:
+                ok = False
+            latency = time.perf_counter() - began
+            if began >= measure_from:
+                with samples_lock:
+                    samples.append((name, latency, ok))
+
+    threads = [threading.Thread(target=simulate, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, min(duration, time.perf_counter() - measure_from)
+
+
+def parse_weights(text):
+    """'inventory=30,recipe_search=0' -> SCENARIOS with those weights replaced; weight 0 drops a scenario."""
+    scenarios = dict(SCENARIOS)
+    for part in filter(None, (part.strip() for part in (text or '').split(','))):
+        name, _, weight = part.partition('=')
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'. Choose from: {', '.join(SCENARIOS)}")
+        scenarios[name] = (float(weight),) + SCENARIOS[name][1:]
+    return {name: scenario for name, scenario in scenarios.items() if scenario[0] > 0}
+
+
+def serve_in_process(port):
+    # Imported only now: the app reads DATABASE_URL and the API endpoints at import
+    from werkzeug.serving import make_server
+    from app import app
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True, name='app-under-test').start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the GrocerU backend with local API stand-ins.")
+    parser.add_argument('--users', type=int, default=50, help="Users to seed and log in as")
+    parser.add_argument('--items', type=int, default=100, help="Items per seeded user")
+    parser.add_argument('--recipes', type=int, default=10, help="Saved recipes per seeded user")
+    parser.add_argument('--concurrency', type=int, default=16, help="Simulated users sending requests at once")
+    parser.add_argument('--duration', type=float, default=30.0, help="Measured seconds")
+    parser.add_argument('--warmup', type=float, default=3.0, help="Unmeasured seconds before measuring")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Client timeout per request")
+    parser.add_argument('--latency-ms', type=float, default=150.0, help="Mean latency of the Edamam/OpenAI stand-ins")
+    parser.add_argument('--jitter', type=float, default=0.25, help="Stand-in latency deviation as a share of the mean")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of stand-in responses that fail")
+    parser.add_argument('--weights', help="Override scenario weights, e.g. 'inventory=30,classify=0'")
+    parser.add_argument('--database', help="Database file (default: a temporary file)")
+    parser.add_argument('--no-seed', action='store_true', help="Use --database as is")
+    parser.add_argument('--target', help="Base URL of an already running server; skips the in-process server and stubs")
+    parser.add_argument('--port', type=int, default=0, help="Port for the in-process server (default: any free port)")
+    parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for data and request mix")
+    parser.add_argument('--json', help="Also write the report to this file")
+    args = parser.parse_args()
+
+    scenarios = parse_weights(args.weights)
+    users = [username(index) for index in range(args.users)]
+
+    if args.target:
+        base_url = args.target
+    else:
+        database = args.database or os.path.join(tempfile.mkdtemp(prefix='grocer-bench-'), 'bench.db')
+        if not args.no_seed:
+            if os.path.exists(database):
+                os.remove(database)
+            started = time.perf_counter()
+            seed(database, args.users, args.items, args.recipes, password=args.password, random_seed=args.seed)
+            print(f"Seeded {database} in {time.perf_counter() - started:.1f}s")
+
+        stub = start_stub(latency_ms=args.latency_ms, jitter=args.jitter, error_rate=args.error_rate)
+        os.environ['DATABASE_URL'] = f"sqlite:///{database}"
+        os.environ['EDAMAM_API_URL'] = f"{stub.url}/search"
+        os.environ['OPENAI_API_BASE'] = f"{stub.url}/v1"
+        for name in ('EDAMAM_APP_ID', 'EDAMAM_APP_KEY', 'OPENAI_API_KEY', 'SECRET_KEY'):
+            os.environ.setdefault(name, 'benchmark')
+        server, base_url = serve_in_process(args.port)
+        print(f"Serving the app at {base_url}; stand-ins at {stub.url} ({args.latency_ms:g} ms, {args.error_rate:.0%} errors)")
+
+    samples, elapsed = run_load(base_url, users, args.password, scenarios, args.concurrency,
+                                args.duration, args.warmup, args.timeout, args.seed)
+    report = summarize(samples, elapsed)
+    print_report(report, elapsed, args.concurrency)
+
+    if not args.target:
+        print(f"\nStand-in requests: {stub.requests} ({stub.errors} failed on purpose)")
+        server.shutdown()
+        stub.shutdown()
+    if args.json:
+        with open(args.json, 'w') as report_file:
+            json.dump({"elapsed_s": round(elapsed, 3), "concurrency": args.concurrency, "scenarios": report},
+                      report_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Seed a SQLite database with benchmark users, items and saved recipes.
+
+Every user gets the same password so the load driver can log in as any of them.
+Run on its own with:  python -m benchmarks.seed /tmp/bench.db --users 200 --items 150 --recipes 20
+"""
+import argparse
+import os
+import random
+import sqlite3
+from bcrypt import gensalt, hashpw
+from database.query_groceru import migrate
+
+DEFAULT_PASSWORD = 'benchmark-password'
+
+# (item name, category, location) drawn for seeded items
+ITEMS = (
+    ('milk', 'Dairy', 'Fridge'), ('eggs', 'Dairy', 'Fridge'), ('butter', 'Dairy', 'Fridge'),
+    ('cheddar cheese', 'Dairy', 'Fridge'), ('yogurt', 'Dairy', 'Fridge'), ('cream cheese', 'Dairy', 'Fridge'),
+    ('apples', 'Fresh Produce', 'Fridge'), ('bananas', 'Fresh Produce', 'Pantry'), ('spinach', 'Fresh Produce', 'Fridge'),
+    ('carrots', 'Fresh Produce', 'Fridge'), ('onions', 'Fresh Produce', 'Pantry'), ('garlic', 'Fresh Produce', 'Pantry'),
+    ('tomatoes', 'Fresh Produce', 'Pantry'), ('potatoes', 'Fresh Produce', 'Pantry'), ('lettuce', 'Fresh Produce', 'Fridge'),
+    ('chicken breast', 'Meat and Seafood', 'Fridge'), ('ground beef', 'Meat and Seafood', 'Fridge'),
+    ('salmon', 'Meat and Seafood', 'Freezer'), ('bacon', 'Meat and Seafood', 'Fridge'), ('shrimp', 'Meat and Seafood', 'Freezer'),
+    ('rice', 'Pantry Staples', 'Pantry'), ('pasta', 'Pantry Staples', 'Pantry'), ('flour', 'Pantry Staples', 'Pantry'),
+    ('sugar', 'Pantry Staples', 'Pantry'), ('olive oil', 'Pantry Staples', 'Pantry'), ('bread', 'Pantry Staples', 'Pantry'),
+    ('peanut butter', 'Pantry Staples', 'Pantry'), ('canned beans', 'Pantry Staples', 'Pantry'), ('soy sauce', 'Pantry Staples', 'Pantry'),
+    ('frozen peas', 'Frozen Foods', 'Freezer'), ('ice cream', 'Frozen Foods', 'Freezer'), ('frozen pizza', 'Frozen Foods', 'Freezer'),
+    ('orange juice', 'Snacks and Beverages', 'Fridge'), ('coffee', 'Snacks and Beverages', 'Pantry'),
+    ('potato chips', 'Snacks and Beverages', 'Pantry'), ('paper towels', 'Household and Miscellaneous', 'Misc.')
+)
+ITEM_STATES = ('High', 'Medium', 'Low')
+RECIPE_WORDS = ('Chicken', 'Beef', 'Salmon', 'Veggie', 'Pasta', 'Rice', 'Bean', 'Egg', 'Spinach', 'Tomato')
+RECIPE_STYLES = ('Skillet', 'Casserole', 'Stir-Fry', 'Soup', 'Salad', 'Bowl', 'Tacos', 'Bake', 'Curry')
+
+
+def username(index):
+    return f"bench_user_{index}"
+
+
+def seed(path, users=50, items_per_user=100, recipes_per_user=10, grocery_share=0.3,
+         password=DEFAULT_PASSWORD, random_seed=0):
+    """
+    Create the schema at `path` and insert `users` users, each with `items_per_user`
+    items (`grocery_share` of them on the grocery list, the rest in the inventory)
+    and `recipes_per_user` saved recipes. Returns the seeded usernames.
+    """
+    rng = random.Random(random_seed)
+    migrate(path)
+    # One hash shared by every user: bcrypt is deliberately slow
+    password_hash = hashpw(password.encode('utf-8'), gensalt())
+
+    conn = sqlite3.connect(path)
+    try:
+        with conn:
+            conn.executemany(
+                'INSERT INTO Users (first_name, last_name, username, email, password_hash) VALUES (?, ?, ?, ?, ?)',
+                [('Bench', f'User {index}', username(index), f'{username(index)}@example.com', password_hash)
+                 for index in range(users)]
+            )
+            user_ids = [row[0] for row in conn.execute(
+                "SELECT user_id FROM Users WHERE username LIKE 'bench_user_%' ORDER BY user_id"
+            )]
+
+            items = []
+            recipes = []
+            for user_id in user_ids:
+                for _ in range(items_per_user):
+                    name, category, location = rng.choice(ITEMS)
+                    in_list = 1 if rng.random() < grocery_share else 0
+                    age_days = rng.uniform(0, 30)
+                    items.append((
+                        name, category, rng.randint(1, 6), in_list, user_id,
+                        None if in_list else rng.choice(ITEM_STATES), location,
+                        f'-{age_days:.3f} days', None if in_list else f'-{age_days:.3f} days'
+                    ))
+                for index in range(recipes_per_user):
+                    title = f"{rng.choice(RECIPE_WORDS)} {rng.choice(RECIPE_STYLES)} {index + 1}"
+                    recipes.append((
+                        user_id, title, f"https://recipes.example.com/{user_id}/{index}",
+                        round(rng.uniform(250, 1800), 2), None, 1 if rng.random() < 0.3 else 0
+                    ))
+
+            conn.executemany(
+                'INSERT INTO Items (item_name, category, quantity, in_list, user_id, item_state, location, created_at, stored_at) '
+                "VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now', ?), CASE WHEN ? IS NULL THEN NULL ELSE datetime('now', ?) END)",
+                [item[:8] + (item[8], item[8]) for item in items]
+            )
+            conn.executemany(
+                'INSERT INTO SavedRecipes (user_id, title, link, calories, diet_labels, Flag) VALUES (?, ?, ?, ?, ?, ?)',
+                recipes
+            )
+        conn.execute('ANALYZE')
+    finally:
+        conn.close()
+    return [username(index) for index in range(users)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a SQLite database for benchmarks.")
+    parser.add_argument('path', help="Database file to create (an existing file is replaced with --reset)")
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--items', type=int, default=100, help="Items per user")
+    parser.add_argument('--recipes', type=int, default=10, help="Saved recipes per user")
+    parser.add_argument('--grocery-share', type=float, default=0.3, help="Share of items on the grocery list")
+    parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    parser.add_argument('--seed', type=int, default=0, help="Random seed, for repeatable data")
+    parser.add_argument('--reset', action='store_true', help="Delete the database file first")
+    args = parser.parse_args()
+
+    if args.reset and os.path.exists(args.path):
+        os.remove(args.path)
+    seed(args.path, args.users, args.items, args.recipes, args.grocery_share, args.password, args.seed)
+    print(f"Seeded {args.users} users with {args.items} items and {args.recipes} saved recipes each into {args.path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Local stand-ins for the Edamam recipe search and OpenAI chat completion APIs.
+
+Both answer with canned but well-formed responses after a configurable latency,
+and fail a configurable share of requests with 429/500/503, so the backend's
+caches, retries and timeouts are exercised without network access or API keys.
+
+Run on their own with:  python -m benchmarks.stubs --latency-ms 150 --error-rate 0.02
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Same values the backend accepts (see CATEGORIES and LOCATIONS in routes/openai.py)
+CATEGORIES = ["Fresh Produce", "Dairy", "Pantry Staples", "Meat and Seafood", "Snacks and Beverages", "Household and Miscellaneous", "Frozen Foods"]
+LOCATIONS = ["Pantry", "Fridge", "Freezer", "Misc."]
+
+ERROR_STATUSES = (429, 500, 503)
+
+INGREDIENT_LINES = (
+    '2 cups all-purpose flour', '1 cup whole milk', '3 large eggs, beaten', '1 tbsp butter',
+    '1 lb chicken breast, diced', '2 cloves garlic, minced', '1 onion, chopped', '1 can diced tomatoes',
+    '1/2 cup shredded cheddar cheese', '1 tsp salt', '1/2 tsp black pepper', '2 tbsp olive oil',
+    '1 cup rice', '1 bunch cilantro', '1 lime, juiced', '200 g spinach', '1 cup chicken broth',
+    '2 carrots, sliced', '1 red bell pepper', '1/4 cup soy sauce', '1 tbsp brown sugar', '8 oz pasta'
+)
+RECIPE_STYLES = ('Skillet', 'Casserole', 'Stir-Fry', 'Soup', 'Salad', 'Bowl', 'Tacos', 'Bake', 'Curry', 'Pasta')
+
+
+def _seed(text):
+    return int(hashlib.sha1(text.encode('utf-8')).hexdigest()[:8], 16)
+
+
+def _pick(options, text):
+    return options[_seed(text) % len(options)]
+
+
+def edamam_hits(query, count=10):
+    """Deterministic Edamam-shaped hits for a search, so repeated searches return the same recipes."""
+    rng = random.Random(_seed(query))
+    base = ' '.join(query.split(',')[0].split()).title() or 'House'
+    hits = []
+    for index in range(count):
+        title = f"{base} {RECIPE_STYLES[(index + rng.randrange(len(RECIPE_STYLES))) % len(RECIPE_STYLES)]} {index + 1}"
+        hits.append({"recipe": {
+            "label": title,
+            "url": f"https://recipes.example.com/{_seed(title)}",
+            "image": f"https://images.example.com/{_seed(title)}.jpg",
+            "calories": round(rng.uniform(250, 1800), 2),
+            "dietLabels": rng.sample(['Balanced', 'High-Protein', 'Low-Carb', 'Low-Fat'], rng.randrange(0, 3)),
+            "ingredientLines": rng.sample(INGREDIENT_LINES, rng.randrange(5, 12))
+        }})
+    return hits
+
+
+def chat_completion(body):
+    """OpenAI chat completion for the prompts the backend sends: a function call or a single word."""
+    prompt = body.get('messages', [{}])[-1].get('content', '')
+    message = {"role": "assistant", "content": None}
+    if body.get('functions'):
+        # classify_chunk lists the items as '<index>. <name>' lines
+        items = [
+            {"index": int(index), "category": _pick(CATEGORIES, name), "location": _pick(LOCATIONS, name)}
+            for index, name in re.findall(r'^(\d+)\. (.+)$', prompt, re.MULTILINE)
+        ]
+        message["function_call"] = {"name": body['functions'][0]['name'], "arguments": json.dumps({"items": items})}
+    elif 'location' in prompt:
+        message["content"] = _pick(LOCATIONS, prompt)
+    else:
+        message["content"] = _pick(CATEGORIES, prompt)
+    return {
+        "id": f"chatcmpl-{_seed(prompt)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get('model', 'gpt-4'),
+        "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": 1, "total_tokens": len(prompt.split()) + 1}
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # Keep-alive, like the real APIs
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay_or_fail(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        if server.latency_ms:
+            time.sleep(max(0.0, random.gauss(server.latency_ms, server.latency_ms * server.jitter)) / 1000)
+        if random.random() < server.error_rate:
+            with server.lock:
+                server.errors += 1
+            self._send(random.choice(ERROR_STATUSES), {"error": "injected failure"})
+            return True
+        return False
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip('/').endswith('/search'):
+            if not self._delay_or_fail():
+                query = parse_qs(url.query).get('q', [''])[0]
+                self._send(200, {"q": query, "hits": edamam_hits(query)})
+            return
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if self.path.rstrip('/').endswith('/chat/completions'):
+            if not self._delay_or_fail():
+                self._send(200, chat_completion(body))
+            return
+        self._send(404, {"error": "not found"})
+
+
+def start_stub(host='127.0.0.1', port=0, latency_ms=100.0, jitter=0.25, error_rate=0.0):
+    """
+    Serve both stand-ins from one background server and return it.
+    Edamam searches live at <server.url>/search and OpenAI at <server.url>/v1.
+    """
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.latency_ms = latency_ms
+    server.jitter = jitter
+    server.error_rate = error_rate
+    server.requests = 0
+    server.errors = 0
+    server.lock = threading.Lock()
+    server.url = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True, name='api-stub').start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Edamam and OpenAI stand-ins.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--latency-ms', type=float, default=100.0, help="Mean response latency")
+    parser.add_argument('--jitter', type=float, default=0.25, help="Latency standard deviation as a share of the mean")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with 429/500/503")
+    args = parser.parse_args()
+
+    server = start_stub(args.host, args.port, args.latency_ms, args.jitter, args.error_rate)
+    print(f"EDAMAM_API_URL={server.url}/search")
+    print(f"OPENAI_API_BASE={server.url}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,39 +1,145 @@
 import sqlite3
 import os
 # Define the path to your database and schema file
-database_path = 'database/new_groceru.db'  # Update with your actual path if needed
-schema_file_path = 'database/visualtables.sql'     # Path to your schema file
-# Establish a connection to the database
-connect = sqlite3.connect(database_path)
-cursor = connect.cursor()
-print("Connection to database successful!")
-# Check if the 'Users' table exists
-cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='Users';")
-result_users = cursor.fetchone()
-# Check if the 'Items' table exists
-cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='Items';")
-result_items = cursor.fetchone()
-# Check if the 'Recipes' table exists
-cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='SavedRecipes';")
-result_saved_recipes = cursor.fetchone()
-# If tables don't exist, apply the schema
-if not result_users or not result_items or not result_saved_recipes:
-    print("Applying schema to database...")
-    # Read and execute the SQL commands in the schema file
+database_dir = os.path.dirname(os.path.abspath(__file__))
+database_path = os.getenv('DATABASE_URL', 'sqlite:///database/new_groceru.db').replace('sqlite:///', '')
+schema_file_path = os.path.join(database_dir, 'visualtables.sql')     # Path to your schema file
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version.
+# Each migration runs in its own transaction and must be safe on databases
+# created before the migration runner existed (tables may already be there).
+# Append new migrations to the end of MIGRATIONS; never edit or reorder applied ones.
+
+def apply_base_schema(conn):
+    # Read the SQL commands in the schema file and execute them one statement at a time
+    # (executescript would commit the migration transaction early)
     with open(schema_file_path, 'r') as schema_file:
-        schema_sql = schema_file.read()
-    # Execute the schema SQL commands
-    try:
-        cursor.executescript(schema_sql)
-        print("Schema has been successfully applied to the database.")
-    except sqlite3.Error as e:
-        print(f"An error occurred while applying the schema: {e}")
-else:
-    print("Schema already applied. Tables are ready!")
-# Closing the established connection
-connect.close()
+        statement = ''
+        for line in schema_file:
+            statement += line
+            if sqlite3.complete_statement(statement):
+                conn.execute(statement)
+                statement = ''
+
+def add_item_timestamps(conn):
+    # SQLite cannot ALTER in a CURRENT_TIMESTAMP default, so inserts set these explicitly
+    item_columns = {row[1] for row in conn.execute("PRAGMA table_info(Items);")}
+    for column in ('created_at', 'stored_at'):
+        if column not in item_columns:
+            conn.execute(f"ALTER TABLE Items ADD COLUMN {column} TIMESTAMP;")
+
+def add_query_indexes(conn):
+    # Items WHERE user_id = ? AND in_list = ?, and the transfer lookup on
+    # (user_id, item_name, location, in_list) share one composite index
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_items_user_list_name_location ON Items (user_id, in_list, item_name, location);")
+    # SavedRecipes WHERE user_id = ? AND Flag = 1
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_saved_recipes_user_flag ON SavedRecipes (user_id, Flag);")
+    # Deletes by (title, user_id), also serves SavedRecipes WHERE user_id = ?
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_saved_recipes_user_title ON SavedRecipes (user_id, title);")
+    conn.execute("ANALYZE;")
 
+def add_user_data_versions(conn):
+    # Per-user counters bumped by triggers on every write to a user's items or recipes.
+    # List endpoints derive their ETags from these, so a conditional GET never reads the rows.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS UserDataVersions (
+            user_id INTEGER PRIMARY KEY,
+            items_version INTEGER NOT NULL DEFAULT 0,
+            recipes_version INTEGER NOT NULL DEFAULT 0
+        );
+    """)
+    for table, column in (('Items', 'items_version'), ('SavedRecipes', 'recipes_version')):
+        bump = (
+            "INSERT INTO UserDataVersions (user_id, {column}) VALUES ({row}.user_id, 1) "
+            "ON CONFLICT(user_id) DO UPDATE SET {column} = {column} + 1;"
+        )
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_version_insert AFTER INSERT ON {table}
+            BEGIN {bump.format(column=column, row='NEW')} END;
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_version_delete AFTER DELETE ON {table}
+            BEGIN {bump.format(column=column, row='OLD')} END;
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_version_update AFTER UPDATE ON {table}
+            BEGIN
+                {bump.format(column=column, row='NEW')}
+                UPDATE UserDataVersions SET {column} = {column} + 1
+                    WHERE user_id = OLD.user_id AND OLD.user_id IS NOT NEW.user_id;
+            END;
+        """)
 
+def add_cache_entries(conn):
+    # Shared key/value store behind services/cache.py, e.g. OpenAI classification results.
+    # Values are JSON; rows past expires_at are ignored on read and pruned on write.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS CacheEntries (
+            namespace TEXT NOT NULL,
+            cache_key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (namespace, cache_key)
+        ) WITHOUT ROWID;
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_expiry ON CacheEntries (namespace, expires_at);")
 
+def backfill_item_timestamps(conn):
+    # Rows older than migration 2 have NULL timestamps, which left existing inventory
+    # out of /expiring_items. The real dates are unknown, so count them from the upgrade.
+    conn.execute("UPDATE Items SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL;")
+    conn.execute("UPDATE Items SET stored_at = created_at WHERE in_list = 0 AND stored_at IS NULL;")
+
+MIGRATIONS = [
+    (1, "Base schema (Users, Items, SavedRecipes)", apply_base_schema),
+    (2, "Item created_at/stored_at timestamps", add_item_timestamps),
+    (3, "Indexes for hot Items and SavedRecipes queries", add_query_indexes),
+    (4, "Per-user data versions for conditional GETs", add_user_data_versions),
+    (5, "Persistent cache entries", add_cache_entries),
+    (6, "Backfill item timestamps left NULL by migration 2", backfill_item_timestamps),
+]
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+def migrate(path=database_path):
+    """
+    Bring the database at `path` up to the latest schema version.
+    Safe to run concurrently: each migration takes the write lock with
+    BEGIN IMMEDIATE and re-checks the version before applying.
+    """
+    # Establish a connection to the database, managing transactions explicitly
+    connect = sqlite3.connect(path, timeout=30, isolation_level=None)
+    print("Connection to database successful!")
+    try:
+        applied = []
+        for version, description, apply in MIGRATIONS:
+            if version <= get_schema_version(connect):
+                continue
+            connect.execute("BEGIN IMMEDIATE;")
+            try:
+                # Another process may have applied it while we waited for the lock
+                if version <= get_schema_version(connect):
+                    connect.execute("ROLLBACK;")
+                    continue
+                print(f"Applying migration {version}: {description}...")
+                apply(connect)
+                connect.execute(f"PRAGMA user_version = {version};")
+                connect.execute("COMMIT;")
+                applied.append(version)
+            except sqlite3.Error as e:
+                connect.execute("ROLLBACK;")
+                print(f"An error occurred while applying migration {version}: {e}")
+                raise
 
+        if applied:
+            print(f"Database migrated to schema version {get_schema_version(connect)}.")
+        else:
+            print(f"Schema already up to date (version {get_schema_version(connect)}). Tables are ready!")
+        return applied
+    finally:
+        # Closing the established connection
+        connect.close()
 
+if __name__ == '__main__':
+    migrate()
@@ -19,6 +19,8 @@ CREATE TABLE IF NOT EXISTS Items (
     item_state TEXT DEFAULT 'Low',
     location TEXT NOT NULL,
     in_list BOOLEAN DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, -- When the item was first added
+    stored_at TIMESTAMP,                            -- When the item entered the inventory (in_list = 0)
     FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
 );
 
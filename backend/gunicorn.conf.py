@@ -0,0 +1,45 @@
+# gunicorn settings for the production server (see wsgi.py), overridable from the environment
+import multiprocessing
+import os
+import shutil
+import tempfile
+from dotenv import load_dotenv
+
+# Load environment variables from .env file before anything reads them
+load_dotenv()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', str(multiprocessing.cpu_count() * 2 + 1)))   # Worker processes
+threads = int(os.getenv('GUNICORN_THREADS', '4'))          # Request threads per worker
+worker_class = 'gthread'
+# Longer than OPENAI_READ_TIMEOUT so a slow completion is not killed mid-request
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '90'))
+graceful_timeout = 30
+keepalive = 5
+
+# Import the app once in the master before forking: FoodKeeper records, shelf-life
+# indexes and the item classifier are built once and shared copy-on-write.
+# Database connections and the outbound HTTP session are opened lazily in each worker.
+preload_app = True
+
+# Workers share their metrics through this directory so /metrics covers the whole
+# server whichever worker answers the scrape; one directory per master process.
+# An empty METRICS_DIR (e.g. 'METRICS_DIR=' in .env) counts as unset.
+if not os.getenv('METRICS_DIR'):
+    os.environ['METRICS_DIR'] = os.path.join(tempfile.gettempdir(), f'grocer-metrics-{os.getpid()}')
+
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    # Runs once in the master, before any worker exists, so migrations never race
+    from database.query_groceru import migrate
+    from services.metrics import clear_snapshots
+    migrate()
+    clear_snapshots()
+
+
+def on_exit(server):
+    if os.getenv('METRICS_DIR'):
+        shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
@@ -1,6 +1,9 @@
 from flask import Blueprint, jsonify, request, session
 from services.database import get_db_connection
-from utils.errorhandler import create_error_response, validate_item_data
+from utils.errorhandler import create_error_response, validate_item_data, item_data_error
+from services.item_listing import ListingError, parse_listing_args, build_item_query, build_page
+from utils.streaming import stream_json_array
+from services.data_version import conditional_get
 from routes.auth import login_required
 import logging
 
@@ -8,18 +11,42 @@ items_bp = Blueprint('items', __name__)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upper bound on operations accepted by one /items/batch request
+MAX_BATCH_OPERATIONS = 500
+
+# Shared listing for the item GET endpoints: filters, sort, `fields=` projection and,
+# when `limit` or `cursor` is given, keyset pagination with a {"items", "next_cursor"} envelope.
+# Without pagination the full list is streamed instead of materialized.
+def list_items(user_id, in_list, not_found_message):
+    try:
+        spec = parse_listing_args(request.args)
+    except ListingError as e:
+        return create_error_response(400, str(e))
+
+    sql, params = build_item_query(user_id, in_list, spec)
+    conn = get_db_connection()
+
+    if spec['paginate']:
+        items = conn.execute(sql, params).fetchall()
+        conn.close()
+        page, next_cursor = build_page(items, spec)
+        return jsonify({"items": page, "next_cursor": next_cursor})
+
+    # Unpaginated lists are streamed straight from the cursor
+    cursor = conn.execute(sql, params)
+    first_item = cursor.fetchone()
+    if first_item is None:
+        conn.close()
+        return create_error_response(404, not_found_message)
+    return stream_json_array(conn, cursor, first_item)
+
 # Get all inventory items (in_list = 0)
 @items_bp.route('/inventory_items', methods=['GET'])
 @login_required
+@conditional_get('items')
 def get_inventory_items():
     user_id = session['user_id']
-    conn = get_db_connection()
-    items = conn.execute('SELECT * FROM Items WHERE user_id = ? AND in_list = 0', (user_id,)).fetchall()
-    conn.close()
-
-    if not items:
-        return create_error_response(404, "No inventory items found.")
-    return jsonify([dict(item) for item in items])
+    return list_items(user_id, 0, "No inventory items found.")
 
 # Delete an inventory item by ID, including `in_list`
 @items_bp.route('/inventory_items/<int:item_id>', methods=['DELETE'])
@@ -51,15 +78,10 @@ def delete_inventory_item(item_id):
 # Get all grocery items (in_list = 1)
 @items_bp.route('/grocery_items', methods=['GET'])
 @login_required
+@conditional_get('items')
 def get_grocery_items():
     user_id = session['user_id']
-    conn = get_db_connection()
-    items = conn.execute('SELECT * FROM Items WHERE user_id = ? AND in_list = 1', (user_id,)).fetchall()
-    conn.close()
-
-    if not items:
-        return create_error_response(404, "No grocery items found.")
-    return jsonify([dict(item) for item in items])
+    return list_items(user_id, 1, "No grocery items found.")
 
 # Delete a grocery item by ID, including `in_list`
 @items_bp.route('/grocery_items/<int:item_id>', methods=['DELETE'])
@@ -91,17 +113,10 @@ def delete_grocery_item(item_id):
 # Get all items regardless of `in_list`
 @items_bp.route('/items', methods=['GET'])
 @login_required
+@conditional_get('items')
 def get_all_items():
     user_id = session['user_id']
-    conn = get_db_connection()
-    items = conn.execute('SELECT * FROM Items WHERE user_id = ?', (user_id,)).fetchall()
-    conn.close()
-
-    if not items:
-        return create_error_response(404, "No items found.")
-    
-    logger.info("Items fetched: %s", [dict(item) for item in items])
-    return jsonify([dict(item) for item in items])
+    return list_items(user_id, None, "No items found.")
 
 # Create a new item with `in_list` field
 @items_bp.route('/items', methods=['POST'])
@@ -118,8 +133,9 @@ def create_item():
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute(
-        'INSERT INTO Items (item_name, category, quantity, in_list, user_id, item_state, location) VALUES (?, ?, ?, ?, ?, ?, ?)', 
-        (data['item_name'], data['category'], data['quantity'], in_list, user_id, data.get('item_state', None), data['location'])
+        'INSERT INTO Items (item_name, category, quantity, in_list, user_id, item_state, location, created_at, stored_at) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CASE WHEN ? = 0 THEN CURRENT_TIMESTAMP END)', 
+        (data['item_name'], data['category'], data['quantity'], in_list, user_id, data.get('item_state', None), data['location'], in_list)
     )
     conn.commit()
     item_id = cursor.lastrowid
@@ -166,14 +182,17 @@ def update_item(item_id):
         conn.close()
         return create_error_response(404, "Item not found.")
 
+    # Moving an item from the grocery list into the inventory stamps it as stored now
     conn.execute(
-        'UPDATE Items SET item_name = ?, category = ?, quantity = ?, in_list = ?, item_state = ?, location = ? WHERE item_id = ?', 
+        'UPDATE Items SET item_name = ?, category = ?, quantity = ?, in_list = ?, item_state = ?, location = ?, '
+        'stored_at = CASE WHEN ? = 0 AND in_list != 0 THEN CURRENT_TIMESTAMP ELSE stored_at END WHERE item_id = ?', 
         (data.get('item_name', item['item_name']),
          data.get('category', item['category']),
          data.get('quantity', item['quantity']),
          data.get('in_list', item['in_list']),
          data.get('item_state', item['item_state']),
          data.get('location', item['location']),
+         data.get('in_list', item['in_list']),
          item_id)
     )
     conn.commit()
@@ -192,6 +211,135 @@ def update_item(item_id):
 
 
 
+# Apply a mixed list of create/update/delete operations in one transaction.
+# Body: {"operations": [{"op": "create", "item": {...}},
+#                       {"op": "update", "item_id": 1, "item": {...}},
+#                       {"op": "delete", "item_id": 2}]}
+# Every operation is validated first; if any is invalid nothing is applied.
+# Operations are resolved in order, so updating or deleting an item deleted earlier in the batch is a 404.
+@items_bp.route('/items/batch', methods=['POST'])
+@login_required
+def batch_items():
+    user_id = session['user_id']
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+
+    if not isinstance(operations, list) or not operations:
+        return create_error_response(400, "Invalid data. Provide a non-empty 'operations' list.")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return create_error_response(400, f"A batch may contain at most {MAX_BATCH_OPERATIONS} operations.")
+
+    # Validate every operation before touching the database
+    errors = []
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get('op') not in ('create', 'update', 'delete'):
+            errors.append({"index": index, "error": "Each operation needs 'op' set to create, update or delete."})
+            continue
+        op = operation['op']
+        if op in ('update', 'delete') and (not isinstance(operation.get('item_id'), int) or isinstance(operation.get('item_id'), bool)):
+            errors.append({"index": index, "error": "Invalid input: 'item_id' must be an integer."})
+            continue
+        if op in ('create', 'update'):
+            error = item_data_error(operation.get('item'))
+            if not error and op == 'create':
+                location = operation['item'].get('location')
+                if not isinstance(location, str) or not location.strip():
+                    error = "Invalid input: 'location' must be a non-empty string."
+            if error:
+                errors.append({"index": index, "error": error})
+
+    if errors:
+        return jsonify({"error": "Batch rejected: invalid operations.", "errors": errors}), 400
+
+    conn = get_db_connection()
+    try:
+        # One lookup for every item the batch references
+        referenced_ids = sorted({operation['item_id'] for operation in operations if operation['op'] != 'create'})
+        existing = {}
+        if referenced_ids:
+            rows = conn.execute(
+                'SELECT * FROM Items WHERE user_id = ? AND item_id IN ({})'.format(','.join(['?'] * len(referenced_ids))),
+                [user_id] + referenced_ids
+            ).fetchall()
+            existing = {row['item_id']: dict(row) for row in rows}
+
+        results = []
+        updates = []
+        deletes = []
+        for index, operation in enumerate(operations):
+            op = operation['op']
+            item = operation.get('item') or {}
+
+            if op == 'create':
+                in_list = item.get('in_list', 0)
+                cursor = conn.execute(
+                    'INSERT INTO Items (item_name, category, quantity, in_list, user_id, item_state, location, created_at, stored_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CASE WHEN ? = 0 THEN CURRENT_TIMESTAMP END)',
+                    (item['item_name'], item['category'], item['quantity'], in_list, user_id, item.get('item_state', None), item['location'], in_list)
+                )
+                results.append({"index": index, "op": op, "status": 201, "item": {
+                    "item_id": cursor.lastrowid,
+                    "item_name": item['item_name'],
+                    "category": item['category'],
+                    "quantity": item['quantity'],
+                    "in_list": in_list,
+                    "user_id": user_id,
+                    "item_state": item.get('item_state'),
+                    "location": item['location']
+                }})
+                continue
+
+            item_id = operation['item_id']
+            current = existing.get(item_id)
+            if current is None:
+                results.append({"index": index, "op": op, "status": 404, "item_id": item_id, "error": "Item not found."})
+                continue
+
+            if op == 'delete':
+                deletes.append((item_id, user_id))
+                del existing[item_id]
+                results.append({"index": index, "op": op, "status": 200, "item_id": item_id})
+                continue
+
+            updated = {
+                "item_id": item_id,
+                "item_name": item['item_name'],
+                "category": item['category'],
+                "quantity": item['quantity'],
+                "in_list": item.get('in_list', current['in_list']),
+                "item_state": item.get('item_state', current['item_state']),
+                "location": item.get('location', current['location']),
+                "user_id": user_id
+            }
+            updates.append((
+                updated['item_name'], updated['category'], updated['quantity'], updated['in_list'],
+                updated['item_state'], updated['location'], updated['in_list'], item_id, user_id
+            ))
+            current.update(updated)
+            results.append({"index": index, "op": op, "status": 200, "item": updated})
+
+        if updates:
+            conn.executemany(
+                'UPDATE Items SET item_name = ?, category = ?, quantity = ?, in_list = ?, item_state = ?, location = ?, '
+                'stored_at = CASE WHEN ? = 0 AND in_list != 0 THEN CURRENT_TIMESTAMP ELSE stored_at END '
+                'WHERE item_id = ? AND user_id = ?',
+                updates
+            )
+        if deletes:
+            conn.executemany('DELETE FROM Items WHERE item_id = ? AND user_id = ?', deletes)
+
+        conn.commit()
+        return jsonify({"results": results}), 200
+
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Error applying item batch: {e}")
+        return create_error_response(500, "Failed to apply item batch.")
+
+    finally:
+        conn.close()
+
+
 @items_bp.route('/send_to_list', methods=['PUT'])
 @login_required
 def updateItemInList():
@@ -210,8 +358,10 @@ def updateItemInList():
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.executemany(
-        'UPDATE Items SET in_list = ? WHERE item_id = ? AND user_id = ?',
-        [(new_in_list_value, item_id, user_id) for item_id in item_ids]
+        'UPDATE Items SET in_list = ?, '
+        'stored_at = CASE WHEN ? = 0 AND in_list != 0 THEN CURRENT_TIMESTAMP ELSE stored_at END '
+        'WHERE item_id = ? AND user_id = ?',
+        [(new_in_list_value, new_in_list_value, item_id, user_id) for item_id in item_ids]
     )
     conn.commit()
     conn.close()
@@ -228,49 +378,54 @@ def transfer_to_inventory():
         return create_error_response(400, "Invalid request. No item IDs provided.")
 
     conn = get_db_connection()
-    cursor = conn.cursor()
+
+    # The selected grocery rows, shared by every statement below
+    selected = 'user_id = ? AND in_list = 1 AND item_id IN ({})'.format(','.join(['?'] * len(item_ids)))
+    selected_params = [user_id] + item_ids
 
     try:
-        # Fetch grocery items to be transferred
-        grocery_items = conn.execute(
-            'SELECT * FROM Items WHERE user_id = ? AND item_id IN ({}) AND in_list = 1'.format(
-                ','.join(['?'] * len(item_ids))
-            ),
-            [user_id] + item_ids
-        ).fetchall()
-
-        if not grocery_items:
+        # Take the write lock up front so the whole transfer is one atomic transaction
+        conn.execute('BEGIN IMMEDIATE')
+
+        grocery_count = conn.execute(f'SELECT COUNT(*) FROM Items WHERE {selected}', selected_params).fetchone()[0]
+
+        if not grocery_count:
+            conn.rollback()
             return create_error_response(404, "No matching grocery items found.")
 
-        for grocery_item in grocery_items:
-            item_name = grocery_item["item_name"]
-            location = grocery_item["location"]
-            quantity = grocery_item["quantity"]
-
-            # Check if the item already exists in the inventory
-            existing_item = conn.execute(
-                'SELECT * FROM Items WHERE user_id = ? AND item_name = ? AND location = ? AND in_list = 0',
-                (user_id, item_name, location)
-            ).fetchone()
-
-            if existing_item:
-                # Increment the quantity of the existing inventory item
-                new_quantity = existing_item["quantity"] + quantity
-                conn.execute(
-                    'UPDATE Items SET quantity = ? WHERE item_id = ?',
-                    (new_quantity, existing_item["item_id"])
-                )
-                # Delete the grocery item after it has been transferred
-                conn.execute(
-                    'DELETE FROM Items WHERE item_id = ?',
-                    (grocery_item["item_id"],)
-                )
-            else:
-                # Add the grocery item to the inventory and remove it from the grocery list
-                conn.execute(
-                    'UPDATE Items SET in_list = 0, item_state = ? WHERE item_id = ?',
-                    ('High', grocery_item["item_id"])
-                )
+        # Add the quantities of grocery items that already exist in the inventory
+        # (same name and location) to the first matching inventory row
+        conn.execute(
+            f'''UPDATE Items AS inv SET quantity = inv.quantity + grocery.total
+            FROM (SELECT item_name, location, SUM(quantity) AS total FROM Items WHERE {selected}
+                  GROUP BY item_name, location) AS grocery
+            WHERE inv.user_id = ? AND inv.in_list = 0
+              AND inv.item_name = grocery.item_name AND inv.location = grocery.location
+              AND inv.item_id = (SELECT MIN(first.item_id) FROM Items AS first
+                                 WHERE first.user_id = inv.user_id AND first.in_list = 0
+                                   AND first.item_name = inv.item_name AND first.location = inv.location)''',
+            selected_params + [user_id]
+        )
+        # Delete the grocery items that were merged
+        conn.execute(
+            f'''DELETE FROM Items WHERE {selected}
+              AND EXISTS (SELECT 1 FROM Items AS inv
+                          WHERE inv.user_id = Items.user_id AND inv.in_list = 0
+                            AND inv.item_name = Items.item_name AND inv.location = Items.location)''',
+            selected_params
+        )
+        # Move the remaining grocery items to the inventory: the first item of each
+        # (name, location) group takes the group's total quantity...
+        conn.execute(
+            f'''UPDATE Items AS leader SET in_list = 0, item_state = 'High', stored_at = CURRENT_TIMESTAMP,
+                  quantity = grocery.total
+            FROM (SELECT MIN(item_id) AS leader_id, SUM(quantity) AS total FROM Items WHERE {selected}
+                  GROUP BY item_name, location) AS grocery
+            WHERE leader.item_id = grocery.leader_id''',
+            selected_params
+        )
+        # ...and the rest of the group, merged into it, is removed from the grocery list
+        conn.execute(f'DELETE FROM Items WHERE {selected}', selected_params)
 
         conn.commit()
 
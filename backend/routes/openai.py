@@ -6,6 +6,10 @@ from dotenv import load_dotenv
 import openai  # import the openai library
 import json
 import re
+from services.cache import PersistentCache, normalize_key
+from services.item_classifier import get_classifier
+from services.http_client import HTTP_CONNECT_TIMEOUT, create_session
+from utils import ingredient_parser
 
 # Load environment variables
 load_dotenv()
@@ -23,8 +27,68 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 logger.info("OpenAI blueprint initialized with API credentials.")
 
-# Initialize OpenAI API
+# Initialize OpenAI API; OPENAI_API_BASE points it at another endpoint, e.g. the benchmark stand-in
 openai.api_key = OPENAI_API_KEY
+openai.api_base = os.getenv('OPENAI_API_BASE', openai.api_base)
+
+# OpenAI requests go through our pooled sessions (openai keeps one per thread)
+# and are bounded by a connect/read deadline instead of the library's 600 seconds
+openai.requestssession = create_session
+OPENAI_READ_TIMEOUT = float(os.getenv('OPENAI_READ_TIMEOUT', '60'))
+OPENAI_REQUEST_TIMEOUT = (HTTP_CONNECT_TIMEOUT, OPENAI_READ_TIMEOUT)
+
+# Classification results keyed by normalized item name, kept across restarts
+CLASSIFICATION_CACHE_SIZE = int(os.getenv('CLASSIFICATION_CACHE_SIZE', '4096'))           # Entries held in memory per cache
+CLASSIFICATION_CACHE_TTL = int(os.getenv('CLASSIFICATION_CACHE_TTL', str(30 * 24 * 3600)))  # Seconds before re-asking OpenAI
+CLASSIFICATION_CACHE_MAX_ROWS = int(os.getenv('CLASSIFICATION_CACHE_MAX_ROWS', '50000'))  # Rows kept in the database per cache
+
+# Batched classification: the model answers through a function call whose
+# arguments follow this schema, one completion per chunk of item names
+CATEGORIES = ["Fresh Produce", "Dairy", "Pantry Staples", "Meat and Seafood", "Snacks and Beverages", "Household and Miscellaneous", "Frozen Foods"]
+LOCATIONS = ["Pantry", "Fridge", "Freezer", "Misc."]
+MAX_CLASSIFY_ITEMS = 200    # Item names accepted by one /classify_items request
+CLASSIFY_CHUNK_SIZE = 25    # Item names sent to OpenAI per completion
+
+CLASSIFY_FUNCTION = {
+    "name": "record_classifications",
+    "description": "Record the grocery category and storage location of every item.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "items": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "index": {"type": "integer", "description": "Index of the item in the input list"},
+                        "category": {"type": "string", "enum": CATEGORIES},
+                        "location": {"type": "string", "enum": LOCATIONS}
+                    },
+                    "required": ["index", "category", "location"]
+                }
+            }
+        },
+        "required": ["items"]
+    }
+}
+
+# Local FoodKeeper classifier; only items it is unsure about go to OpenAI
+CLASSIFIER_MIN_CONFIDENCE = float(os.getenv('CLASSIFIER_MIN_CONFIDENCE', '0.8'))
+item_classifier = get_classifier()
+
+def classify_locally(item_name):
+    """Return the local classifier's answer when it clears CLASSIFIER_MIN_CONFIDENCE, else None."""
+    answer = item_classifier.classify(item_name)
+    if answer and answer['confidence'] >= CLASSIFIER_MIN_CONFIDENCE:
+        return answer
+    return None
+
+category_cache = PersistentCache(
+    'category', CLASSIFICATION_CACHE_SIZE, CLASSIFICATION_CACHE_TTL, CLASSIFICATION_CACHE_MAX_ROWS
+)
+location_cache = PersistentCache(
+    'location', CLASSIFICATION_CACHE_SIZE, CLASSIFICATION_CACHE_TTL, CLASSIFICATION_CACHE_MAX_ROWS
+)
 
 @openai_bp.route('/categorize_item', methods=['POST'])
 def categorize_item():
@@ -37,6 +101,20 @@ def categorize_item():
     
     logger.info("Categorizing item: %s", item_name)
 
+    local = classify_locally(item_name)
+    if local:
+        logger.info("Category classified locally: %s (confidence %s)", local['category'], local['confidence'])
+        return jsonify({
+            'category': local['category']
+        }), 200
+
+    cached_category = category_cache.get(item_name)
+    if cached_category:
+        logger.info("Category served from cache: %s", cached_category)
+        return jsonify({
+            'category': cached_category
+        }), 200
+
     # Construct the OpenAI API request (chat-based API)
     messages = [
         {"role": "system", "content": "You are a helpful assistant."},
@@ -46,7 +124,8 @@ def categorize_item():
     try:
         response = openai.ChatCompletion.create(
             model="gpt-4",
-            messages=messages
+            messages=messages,
+            request_timeout=OPENAI_REQUEST_TIMEOUT
         )
 
         # Extract the category from the OpenAI response
@@ -57,6 +136,7 @@ def categorize_item():
             return create_error_response(404, "No category predicted for the item.")
 
         logger.info("Category predicted by OpenAI: %s", category)
+        category_cache.set(item_name, category)
         
         return jsonify({
             'category': category  # Return the predicted category in the response
@@ -77,6 +157,20 @@ def locate_item():
     
     logger.info("Locating item: %s", item_name)
 
+    local = classify_locally(item_name)
+    if local:
+        logger.info("Location classified locally: %s (confidence %s)", local['location'], local['confidence'])
+        return jsonify({
+            'location': local['location']
+        }), 200
+
+    cached_location = location_cache.get(item_name)
+    if cached_location:
+        logger.info("Location served from cache: %s", cached_location)
+        return jsonify({
+            'location': cached_location
+        }), 200
+
     # Construct the OpenAI API request (chat-based API)
     messages = [
         {"role": "system", "content": "You are a helpful assistant."},
@@ -86,7 +180,8 @@ def locate_item():
     try:
         response = openai.ChatCompletion.create(
             model="gpt-4",
-            messages=messages
+            messages=messages,
+            request_timeout=OPENAI_REQUEST_TIMEOUT
         )
 
         # Extract the category from the OpenAI response
@@ -97,6 +192,7 @@ def locate_item():
             return create_error_response(404, "No location predicted for the item.")
 
         logger.info("Location predicted by OpenAI: %s", location)
+        location_cache.set(item_name, location)
         
         return jsonify({
             'location': location  # Return the predicted category in the response
@@ -106,6 +202,114 @@ def locate_item():
         logger.error(f"Error communicating with OpenAI API: {str(e)}")
         return create_error_response(500, "Error predicting location.")
     
+def classify_chunk(item_names):
+    """
+    Classify up to CLASSIFY_CHUNK_SIZE item names with a single completion.
+    Returns {index: {"category": ..., "location": ...}}; items the model skipped
+    or answered outside the allowed values are left out.
+    """
+    listing = "\n".join(f"{index}. {name}" for index, name in enumerate(item_names))
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant that sorts grocery items."},
+        {"role": "user", "content": f"For each numbered item below, pick the category out of {CATEGORIES} it best fits in and the location out of {LOCATIONS} it most belongs in. Classify every item.\n{listing}"}
+    ]
+    response = openai.ChatCompletion.create(
+        model="gpt-4",
+        messages=messages,
+        functions=[CLASSIFY_FUNCTION],
+        function_call={"name": CLASSIFY_FUNCTION["name"]},
+        request_timeout=OPENAI_REQUEST_TIMEOUT
+    )
+    function_call = response['choices'][0]['message'].get('function_call') or {}
+    try:
+        answers = json.loads(function_call.get('arguments') or '{}').get('items', [])
+    except (json.JSONDecodeError, AttributeError):
+        logger.error("OpenAI returned malformed classification arguments.")
+        return {}
+
+    classified = {}
+    for answer in answers:
+        if not isinstance(answer, dict):
+            continue
+        index = answer.get('index')
+        if (isinstance(index, int) and 0 <= index < len(item_names)
+                and answer.get('category') in CATEGORIES and answer.get('location') in LOCATIONS):
+            classified[index] = {"category": answer['category'], "location": answer['location']}
+    return classified
+
+
+def classify_names(item_names):
+    """
+    Return {normalized name: {"category", "location"}} for `item_names`.
+    Confident local answers are used first, then cached answers; the rest go
+    to OpenAI in chunks of CLASSIFY_CHUNK_SIZE and are cached. Names whose
+    chunk failed are left out.
+    """
+    classified = {}
+    keys = []
+    for key in dict.fromkeys(normalize_key(name) for name in item_names):
+        local = classify_locally(key)
+        if local:
+            classified[key] = {"category": local['category'], "location": local['location']}
+        else:
+            keys.append(key)
+
+    categories = category_cache.get_many(keys)
+    locations = location_cache.get_many(keys)
+
+    classified.update({
+        key: {"category": categories[key], "location": locations[key]}
+        for key in keys if key in categories and key in locations
+    })
+    missing = [key for key in keys if key not in classified]
+
+    for start in range(0, len(missing), CLASSIFY_CHUNK_SIZE):
+        chunk = missing[start:start + CLASSIFY_CHUNK_SIZE]
+        try:
+            answers = classify_chunk(chunk)
+        except openai.error.OpenAIError as e:
+            logger.error(f"Error communicating with OpenAI API: {str(e)}")
+            continue
+        chunk_results = {chunk[index]: answer for index, answer in answers.items()}
+        category_cache.set_many({key: answer["category"] for key, answer in chunk_results.items()})
+        location_cache.set_many({key: answer["location"] for key, answer in chunk_results.items()})
+        classified.update(chunk_results)
+
+    return classified
+
+
+@openai_bp.route('/classify_items', methods=['POST'])
+def classify_items():
+    data = request.get_json(silent=True) or {}
+    item_names = data.get('item_names')
+
+    if not isinstance(item_names, list) or not item_names:
+        logger.warning("Request missing required field: item_names")
+        return create_error_response(400, "Missing required field: item_names, or it must be a non-empty list.")
+    if len(item_names) > MAX_CLASSIFY_ITEMS:
+        return create_error_response(400, f"A request may classify at most {MAX_CLASSIFY_ITEMS} items.")
+    if not all(isinstance(name, str) and name.strip() for name in item_names):
+        return create_error_response(400, "Every item name must be a non-empty string.")
+
+    logger.info("Classifying %d item(s)", len(item_names))
+    classified = classify_names(item_names)
+
+    results = []
+    for name in item_names:
+        answer = classified.get(normalize_key(name), {})
+        results.append({
+            'item_name': name,
+            'category': answer.get('category'),
+            'location': answer.get('location')
+        })
+
+    if not classified:
+        return create_error_response(500, "Error classifying items.")
+
+    return jsonify({
+        'classifications': results  # Same order as the request; unclassified items have null fields
+    }), 200
+
 @openai_bp.route('/clean_ingredients', methods=['POST'])
 def clean_ingredients():
     data = request.json
@@ -117,50 +321,11 @@ def clean_ingredients():
     
     logger.info("Cleaning ingredients: %s", ingredients)
 
-    try:
-        # Construct the OpenAI API request
-        messages = [
-            {"role": "system", "content": "You are a helpful assistant that extracts only the main food names from a list of ingredients, ignoring water and descriptors."},
-            {"role": "user", "content": f"Extract the main food names from these ingredients, ignoring 'water' and any measurements or descriptors: {ingredients}. Return the result as a JSON array of food names."}
-        ]
+    # Quantities, units and descriptors are stripped locally; no model call is needed
+    cleaned_ingredients = ingredient_parser.clean_ingredients(ingredients)
 
-        # Log the input to OpenAI
-        logger.debug("OpenAI input messages: %s", messages)
+    logger.info("Cleaned ingredients: %s", cleaned_ingredients)
 
-        # Use OpenAI's ChatCompletion API to process the ingredients
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=messages
-        )
-
-        # Extract the raw response from OpenAI
-        cleaned_ingredients_raw = response['choices'][0]['message']['content'].strip()
-
-        # Log the raw output from OpenAI
-        logger.debug("OpenAI raw output: %s", cleaned_ingredients_raw)
-
-        # Attempt to parse the response
-        try:
-            # Try to parse as JSON directly
-            cleaned_ingredients = json.loads(cleaned_ingredients_raw)
-        except json.JSONDecodeError:
-            # If JSON parsing fails, evaluate it as a Python literal
-            cleaned_ingredients = ast.literal_eval(cleaned_ingredients_raw)
-
-        # Validate the cleaned ingredients
-        if not isinstance(cleaned_ingredients, list):
-            logger.error("Parsed response is not a valid list.")
-            return create_error_response(500, "AI response format is invalid.")
-
-        logger.info("Cleaned ingredients from OpenAI: %s", cleaned_ingredients)
-
-        return jsonify({
-            'cleaned_ingredients': cleaned_ingredients  # Return the cleaned ingredients
-        }), 200
-
-    except openai.error.OpenAIError as e:
-        logger.error(f"Error communicating with OpenAI API: {str(e)}")
-        return create_error_response(500, "Error cleaning ingredients with AI.")
-    except Exception as e:
-        logger.error(f"Unexpected error cleaning ingredients: {str(e)}")
-        return create_error_response(500, "Unexpected error cleaning ingredients.")
+    return jsonify({
+        'cleaned_ingredients': cleaned_ingredients  # Return the cleaned ingredients
+    }), 200
@@ -2,12 +2,18 @@ from flask import Blueprint, jsonify, request, session
 from utils.errorhandler import create_error_response
 from services.database import get_db_connection
 from routes.auth import login_required
-from services.database import get_db_connection
+from utils.streaming import stream_json_array
+from services.data_version import conditional_get
+from services import edamam
+from utils.ingredient_parser import clean_ingredient, clean_ingredients
+from services.recipe_coverage import RecipeCoverageIndex, covering_keys, ingredient_key
+from routes.openai import classify_names
+from services.cache import normalize_key
 import logging
 from dotenv import load_dotenv
 import requests
 import os
-import re
+from concurrent.futures import ThreadPoolExecutor
 
 
 
@@ -29,6 +35,19 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 logger.info("Recipes blueprint initialized with Edamam API credentials.")
 
+# Batched ingredient fetches: titles per request and concurrent Edamam searches
+MAX_INGREDIENT_TITLES = 50
+# Recipes ranked by one /recipe_coverage request, and how many of them may be looked up
+# on Edamam; the rest are reported as unresolved so one request stays within the rate limit
+MAX_COVERAGE_RECIPES = 500
+MAX_COVERAGE_LOOKUPS = int(os.getenv('MAX_COVERAGE_LOOKUPS', '10'))
+INGREDIENT_FETCH_WORKERS = int(os.getenv('INGREDIENT_FETCH_WORKERS', '8'))
+ingredient_executor = ThreadPoolExecutor(max_workers=INGREDIENT_FETCH_WORKERS, thread_name_prefix='ingredients')
+
+# Category and location for shopping-list items nothing in FoodKeeper resembles
+DEFAULT_CATEGORY = "Household and Miscellaneous"
+DEFAULT_LOCATION = "Misc."
+
 
 @recipes_bp.route('/meals_generated', methods=['POST'])
 @login_required
@@ -52,21 +71,13 @@ def receive_meals():
     item_query = ','.join(item['item_name'].strip() for item in items)
     logger.info("Constructed item query: %s", item_query)
 
-    # Construct the recipe URL
-    recipe_url = (
-        f"https://api.edamam.com/search?q={item_query}"
-        f"&app_id={EDAMAM_APP_ID}&app_key={EDAMAM_APP_KEY}"
-    )
-    # Print the constructed URL for debugging
-    print("Constructed Edamam API URL:", recipe_url)  # Add this line for debugging
-    # Or you can use logging if preferred:
-    logger.info("Constructed Edamam API URL: %s", recipe_url)
+    # Search parameters; credentials are added by the Edamam client
+    params = {'q': item_query}
+    logger.info("Searching Edamam with parameters: %s", params)
 
     try:
-        # Make the request to the Edamam API
-        response = requests.get(recipe_url)
-        response.raise_for_status()
-        recipes = response.json().get('hits', [])[:5]
+        # Served from the response cache when the same search was made recently
+        recipes = edamam.search(params)[:5]
 
         if not recipes:
             logger.info("No recipes found for the given criteria.")
@@ -120,60 +131,27 @@ def search_recipes():
 
     logger.info(f"Extracted values - cuisineType: {cuisine_type}, diet: {health}, allergies: {allergies}, calorieRange: {calories}")
 
-    allergies_params = ''.join(f"&allergies={item}" for item in allergies if item and item != 'None')
-    recipe_url = f"https://api.edamam.com/search?q={cuisine_type}"
-    
-    if calories:
-        recipe_url += f"&calories={calories}"
-    if health:
-        recipe_url += f"&health={health}"
-    if allergies_params:
-        recipe_url += allergies_params
-    recipe_url += f"&app_id={EDAMAM_APP_ID}&app_key={EDAMAM_APP_KEY}"
+    params = {
+        'q': cuisine_type,
+        'calories': calories,
+        'health': health,
+        'allergies': [item for item in allergies if item and item != 'None']
+    }
 
-    logger.info("Querying Edamam API with URL: %s", recipe_url)
+    logger.info("Searching Edamam with parameters: %s", params)
 
     try:
-        response = requests.get(recipe_url)
-        response.raise_for_status()
-        recipes = response.json().get('hits', [])[:5]
+        recipes = edamam.search(params)[:5]
         
         if not recipes:
             logger.info("No recipes found for the specified criteria.")
             return create_error_response(404, "No recipes found with the specified criteria.")
 
-        # Group ingredients by recipe
-        def extract_clean_ingredients_by_recipe(recipes):
-            """
-            Extract and clean ingredients grouped by recipe.
-
-            Args:
-                recipes (list): List of recipes from the API response.
-
-            Returns:
-                dict: A dictionary with recipe titles as keys and lists of unique cleaned ingredients as values.
-            """
-            result = {}
-
-            for recipe_data in recipes:
-                recipe = recipe_data['recipe']
-                title = recipe['label']
-                ingredients = recipe.get('ingredientLines', [])
-
-                # Clean ingredients
-                def clean_ingredient(item):
-                    item = re.sub(r'[\d/]+(\s?[a-z]+)?(\s?[a-z]+)?', '', item)  # Remove measurements
-                    item = re.sub(r'\(.*?\)|,.*$', '', item)  # Remove parentheses and descriptions
-                    return item.strip().lower()
-
-                cleaned_ingredients = [clean_ingredient(ingredient) for ingredient in ingredients]
-                unique_ingredients = list(set(cleaned_ingredients))
-                result[title] = unique_ingredients
-
-            return result
-
-        # Extract and clean ingredients grouped by recipe
-        ingredients_by_recipe = extract_clean_ingredients_by_recipe(recipes)
+        # Clean ingredients grouped by recipe title with the shared ingredient parser
+        ingredients_by_recipe = {
+            recipe['recipe']['label']: clean_ingredients(recipe['recipe'].get('ingredientLines') or [])
+            for recipe in recipes
+        }
         logger.info("Ingredients grouped by recipe: %s", ingredients_by_recipe)
 
         # Prepare the recipe links
@@ -250,33 +228,20 @@ def add_recipe_item():
     
 @recipes_bp.route('/recipe_items1', methods=['GET'])
 @login_required
+@conditional_get('recipes')
 def fetch_favorite_recipes():
     try:
         user_id = session['user_id']
         if not user_id:
             return jsonify({"error": "User not logged in"}), 401
         
-        # Fetch recipes with Flag = 1 (favorited) for the user
+        # Fetch recipes with Flag = 1 (favorited) for the user and stream them as they are read
         conn = get_db_connection()
-        recipes = conn.execute(
-            'SELECT * FROM SavedRecipes WHERE user_id = ? AND Flag = 1',
+        cursor = conn.execute(
+            'SELECT title, link, calories, diet_labels, user_id, Flag FROM SavedRecipes WHERE user_id = ? AND Flag = 1',
             (user_id,)
-        ).fetchall()
-        conn.close()
-
-        # Convert recipes to a list of dictionaries
-        recipe_list = [
-            {
-                "title": row["title"],
-                "link": row["link"],
-                "calories": row["calories"],
-                "diet_labels": row["diet_labels"],
-                "user_id": row["user_id"],
-                "Flag": row["Flag"]
-            } for row in recipes
-        ]
-
-        return jsonify(recipe_list), 200
+        )
+        return stream_json_array(conn, cursor)
     except Exception as e:
         logging.error("Error fetching favorite recipes: %s", str(e))
         return jsonify({"error": str(e)}), 500
@@ -286,33 +251,20 @@ def fetch_favorite_recipes():
 
 @recipes_bp.route('/recipe_items', methods=['GET'])
 @login_required
+@conditional_get('recipes')
 def fetch_saved_recipes():
     try:
         user_id = session['user_id']
         if not user_id:
             return jsonify({"error": "User not logged in"}), 401
         
-        # Fetch recipes with Flag = 1 (favorited) for the user
+        # Fetch all saved recipes for the user and stream them as they are read
         conn = get_db_connection()
-        recipes = conn.execute(
-            'SELECT * FROM SavedRecipes WHERE user_id = ?',
+        cursor = conn.execute(
+            'SELECT title, link, calories, diet_labels, user_id, Flag FROM SavedRecipes WHERE user_id = ?',
             (user_id,)
-        ).fetchall()
-        conn.close()
-
-        # Convert recipes to a list of dictionaries
-        recipe_list = [
-            {
-                "title": row["title"],
-                "link": row["link"],
-                "calories": row["calories"],
-                "diet_labels": row["diet_labels"],
-                "user_id": row["user_id"],
-                "Flag": row["Flag"]
-            } for row in recipes
-        ]
-
-        return jsonify(recipe_list), 200
+        )
+        return stream_json_array(conn, cursor)
     except Exception as e:
         logging.error("Error fetching favorite recipes: %s", str(e))
         return jsonify({"error": str(e)}), 500
@@ -334,18 +286,9 @@ def fetch_ingredients():
         if not title:
             return create_error_response(400, "The field 'title' is required.")
 
-        # Construct the API URL
-        recipe_url = f"https://api.edamam.com/search?q={title}&app_id={EDAMAM_APP_ID}&app_key={EDAMAM_APP_KEY}"
-
-        # Log the URL for debugging
-        logger.info("Constructed Edamam API URL: %s", recipe_url)
-
-        # Call the Edamam API
-        response = requests.get(recipe_url)
-        response.raise_for_status()
-
-        # Extract the relevant recipes
-        recipes = response.json().get('hits', [])
+        # Search Edamam for the title (cached)
+        logger.info("Searching Edamam for recipe title: %s", title)
+        recipes = edamam.search({'q': title})
 
         if not recipes:
             return create_error_response(404, "No recipes found for the given title.")
@@ -367,6 +310,247 @@ def fetch_ingredients():
         return create_error_response(500, "Error fetching recipes from Edamam API.")
     
 
+def fetch_ingredient_result(title):
+    """Search Edamam for one title and return its per-title result entry."""
+    try:
+        recipes = edamam.search({'q': title})
+    except requests.exceptions.RequestException as e:
+        logger.error("Error fetching recipes from Edamam API for '%s': %s", title, e)
+        return {"title": title, "status": 502, "error": "Error fetching recipes from Edamam API."}
+    except Exception as e:
+        logger.error("Unexpected error fetching ingredients for '%s': %s", title, e)
+        return {"title": title, "status": 500, "error": "Unexpected error fetching ingredients."}
+
+    if not recipes:
+        return {"title": title, "status": 404, "error": "No recipes found for the given title."}
+    return {
+        "title": title,
+        "status": 200,
+        "ingredientLines": [recipe['recipe']['ingredientLines'] for recipe in recipes]
+    }
+
+
+def fetch_recipe_ingredients(title, link=None):
+    """
+    Search Edamam for one title and return the ingredient lines of that recipe: the hit
+    with the same link, else the hit with the same title. Other hits are different recipes.
+    """
+    try:
+        hits = edamam.search({'q': title})
+    except requests.exceptions.RequestException as e:
+        logger.error("Error fetching recipes from Edamam API for '%s': %s", title, e)
+        return {"title": title, "status": 502, "error": "Error fetching recipes from Edamam API."}
+    except Exception as e:
+        logger.error("Unexpected error fetching ingredients for '%s': %s", title, e)
+        return {"title": title, "status": 500, "error": "Unexpected error fetching ingredients."}
+
+    recipes = [hit['recipe'] for hit in hits]
+    match = next((recipe for recipe in recipes if link and recipe.get('url') == link), None) or next(
+        (recipe for recipe in recipes if recipe.get('label', '').strip().casefold() == title.strip().casefold()), None
+    )
+    if match is None:
+        return {"title": title, "status": 404, "error": "No recipe with this title was found."}
+    return {"title": title, "status": 200, "ingredients": match['ingredientLines']}
+
+
+@recipes_bp.route('/fetch_ingredients_batch', methods=['POST'])
+@login_required
+def fetch_ingredients_batch():
+    """
+    Fetch ingredient lines for many recipe titles at once.
+    Titles are searched concurrently on a bounded thread pool, so the request takes
+    about one Edamam round trip; each title gets its own status and error.
+    """
+    data = request.get_json(silent=True) or {}
+    titles = data.get('titles')
+
+    if not isinstance(titles, list) or not titles:
+        return create_error_response(400, "The field 'titles' must be a non-empty list.")
+    if not all(isinstance(title, str) and title.strip() for title in titles):
+        return create_error_response(400, "Every title must be a non-empty string.")
+
+    unique_titles = list(dict.fromkeys(title.strip() for title in titles))
+    if len(unique_titles) > MAX_INGREDIENT_TITLES:
+        return create_error_response(400, f"A batch may contain at most {MAX_INGREDIENT_TITLES} titles.")
+
+    results = list(ingredient_executor.map(fetch_ingredient_result, unique_titles))
+    logger.info("Fetched ingredients for %d title(s).", len(results))
+
+    return jsonify({'results': results}), 200
+
+
+@recipes_bp.route('/recipe_coverage', methods=['POST'])
+@login_required
+def recipe_coverage():
+    """
+    Rank recipes by how much of each the user can cook from their inventory.
+
+    Body (all optional):
+      recipes: [{"title": ..., "link": ..., "ingredients": [lines]}] from a search;
+               recipes without ingredients are looked up on Edamam (cached), at most
+               MAX_COVERAGE_LOOKUPS per request, searched recipes first
+      include_saved: rank the user's saved recipes too (default true)
+      limit: number of ranked recipes to return
+    """
+    user_id = session['user_id']
+    data = request.get_json(silent=True) or {}
+    searched = data.get('recipes', [])
+    include_saved = data.get('include_saved', True)
+    limit = data.get('limit')
+
+    if not isinstance(searched, list) or not all(isinstance(recipe, dict) and recipe.get('title') for recipe in searched):
+        return create_error_response(400, "'recipes' must be a list of objects with a 'title'.")
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+        return create_error_response(400, "'limit' must be a positive integer.")
+
+    conn = get_db_connection()
+    try:
+        inventory_names = [row['item_name'] for row in conn.execute(
+            'SELECT item_name FROM Items WHERE user_id = ? AND in_list = 0', (user_id,)
+        )]
+        saved = conn.execute(
+            'SELECT title, link, calories FROM SavedRecipes WHERE user_id = ?', (user_id,)
+        ).fetchall() if include_saved else []
+    finally:
+        conn.close()
+
+    # Searched recipes first; a saved recipe with the same title adds nothing new
+    candidates = {}
+    for recipe in searched:
+        candidates.setdefault(recipe['title'], {
+            "title": recipe['title'],
+            "link": recipe.get('link'),
+            "ingredients": recipe.get('ingredients') if isinstance(recipe.get('ingredients'), list) else None
+        })
+    for row in saved:
+        candidates.setdefault(row['title'], {"title": row['title'], "link": row['link'], "ingredients": None})
+
+    if len(candidates) > MAX_COVERAGE_RECIPES:
+        return create_error_response(400, f"At most {MAX_COVERAGE_RECIPES} recipes can be ranked at once.")
+
+    # Look up missing ingredient lists concurrently; titles that fail are reported, not ranked
+    unresolved = []
+    to_fetch = [title for title, recipe in candidates.items() if recipe["ingredients"] is None]
+    for title in to_fetch[MAX_COVERAGE_LOOKUPS:]:
+        unresolved.append({"title": title, "status": 429,
+                           "error": f"At most {MAX_COVERAGE_LOOKUPS} recipes are looked up per request."})
+        del candidates[title]
+    to_fetch = to_fetch[:MAX_COVERAGE_LOOKUPS]
+    links = [candidates[title]["link"] for title in to_fetch]
+    for result in ingredient_executor.map(fetch_recipe_ingredients, to_fetch, links):
+        if result["status"] == 200:
+            candidates[result["title"]]["ingredients"] = result["ingredients"]
+        else:
+            unresolved.append({"title": result["title"], "status": result["status"], "error": result["error"]})
+            del candidates[result["title"]]
+
+    index = RecipeCoverageIndex({title: recipe["ingredients"] for title, recipe in candidates.items()})
+    ranked = index.score(inventory_names, limit)
+    for entry in ranked:
+        entry["link"] = candidates[entry["title"]]["link"]
+
+    logger.info("Ranked %d recipe(s) against %d inventory item(s).", len(ranked), len(inventory_names))
+    return jsonify({'recipes': ranked, 'unresolved': unresolved}), 200
+
+
+def missing_ingredient_keys(conn, user_id, needed):
+    """Keys of `needed`, in order, that none of the user's items has or covers."""
+    have = {key for key in (ingredient_key(row['item_name']) for row in conn.execute(
+        'SELECT item_name FROM Items WHERE user_id = ?', (user_id,)
+    )) if key}
+    missing_keys = needed.keys() - have
+    return [
+        key for key in needed
+        if key in missing_keys and not any(candidate in have for candidate in covering_keys(key))
+    ]
+
+
+@recipes_bp.route('/shopping_list_from_recipes', methods=['POST'])
+@login_required
+def shopping_list_from_recipes():
+    """
+    Add every ingredient of one or more recipes that the user does not already
+    have (in the inventory or on the grocery list) to the grocery list.
+
+    Body: {"titles": [...]}. Ingredient lists are looked up concurrently, cleaned
+    and normalized to keys; the user's items are reduced to a key set once and
+    the missing ingredients are a set difference against it, so an item 'Eggs'
+    covers '3 large eggs, beaten' and 'milk' covers 'whole milk'.
+    New items are classified like /classify_items (confident local answers, then
+    the cache, then OpenAI) and inserted in a single transaction.
+    """
+    user_id = session['user_id']
+    data = request.get_json(silent=True) or {}
+    titles = data.get('titles')
+
+    if not isinstance(titles, list) or not titles:
+        return create_error_response(400, "The field 'titles' must be a non-empty list.")
+    if not all(isinstance(title, str) and title.strip() for title in titles):
+        return create_error_response(400, "Every title must be a non-empty string.")
+
+    unique_titles = list(dict.fromkeys(title.strip() for title in titles))
+    if len(unique_titles) > MAX_INGREDIENT_TITLES:
+        return create_error_response(400, f"At most {MAX_INGREDIENT_TITLES} recipes can be added at once.")
+
+    # Ingredient key -> display name, in recipe order across all recipes
+    needed = {}
+    unresolved = []
+    for result in ingredient_executor.map(fetch_ingredient_result, unique_titles):
+        if result["status"] != 200:
+            unresolved.append({"title": result["title"], "status": result["status"], "error": result["error"]})
+            continue
+        for line in result["ingredientLines"][0]:
+            key = ingredient_key(line)
+            if key:
+                needed.setdefault(key, clean_ingredient(line))
+
+    if not needed:
+        return jsonify({'added': [], 'already_have': [], 'unresolved': unresolved}), 200
+
+    # Classify the ingredients the user seems to be missing before taking the write lock,
+    # so an OpenAI round trip for names the local classifier is unsure of never holds it
+    conn = get_db_connection()
+    try:
+        candidates = missing_ingredient_keys(conn, user_id, needed)
+    finally:
+        conn.close()
+    classified = classify_names([needed[key] for key in candidates])
+
+    conn = get_db_connection()
+    try:
+        # Take the write lock before reading so concurrent requests cannot add the same items twice
+        conn.execute('BEGIN IMMEDIATE')
+        missing = missing_ingredient_keys(conn, user_id, needed)
+        already_have = [needed[key] for key in needed if key not in missing]
+
+        added = []
+        for key in missing:
+            answer = classified.get(normalize_key(needed[key]), {})
+            row = {
+                "item_name": needed[key],
+                "category": answer.get('category', DEFAULT_CATEGORY),
+                "quantity": 1,
+                "in_list": 1,
+                "location": answer.get('location', DEFAULT_LOCATION)
+            }
+            cursor = conn.execute(
+                'INSERT INTO Items (item_name, category, quantity, in_list, user_id, item_state, location, created_at, stored_at) '
+                'VALUES (?, ?, 1, 1, ?, NULL, ?, CURRENT_TIMESTAMP, NULL)',
+                (row["item_name"], row["category"], user_id, row["location"])
+            )
+            added.append({"item_id": cursor.lastrowid, **row})
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logger.error("Error adding recipe ingredients to the grocery list: %s", e)
+        return create_error_response(500, "Error adding recipe ingredients to the grocery list.")
+    finally:
+        conn.close()
+
+    logger.info("Added %d ingredient(s) from %d recipe(s) to the grocery list.", len(added), len(unique_titles))
+    return jsonify({'added': added, 'already_have': already_have, 'unresolved': unresolved}), 201 if added else 200
+
+
 @recipes_bp.route('/recipe_items/<string:title>', methods=['DELETE'])
 @login_required
 def delete_recipe(title):
@@ -1,92 +1,278 @@
-from flask import Blueprint, jsonify, request
-import pandas as pd
+from flask import Blueprint, jsonify, request, session
 import numpy as np
-import os
+from functools import lru_cache
+from services.fuzzy_matcher import FuzzyMatcher
+from services.database import get_db_connection
+from services.expiration import ExpirationEngine
+from services.foodkeeper import load_records, column_values
+from routes.auth import login_required
+from utils.errorhandler import create_error_response
 
 shelf_life_bp = Blueprint('shelf_life', __name__)
 
-csv_path = "/app/database/FoodKeeper-Data.csv"
-
-# Check if file exists
-if not os.path.isfile(csv_path):
-    raise FileNotFoundError(f"CSV file not found at path: {csv_path}")
-
-# List of columns to consider, excluding Category_ID and ID
-valid_columns = [
-    "Name", "Name_subtitle", "Keywords", 
-    "Pantry_Min", "Pantry_Max", "Pantry_Metric", "Pantry_tips", 
-    "DOP_Pantry_Min", "DOP_Pantry_Max", "DOP_Pantry_Metric", "DOP_Pantry_tips", 
-    "Pantry_After_Opening_Min", "Pantry_After_Opening_Max", "Pantry_After_Opening_Metric", 
-    "Refrigerate_Min", "Refrigerate_Max", "Refrigerate_Metric", "Refrigerate_tips", 
-    "DOP_Refrigerate_Min", "DOP_Refrigerate_Max", "DOP_Refrigerate_Metric", "DOP_Refrigerate_tips", 
-    "Refrigerate_After_Opening_Min", "Refrigerate_After_Opening_Max", "Refrigerate_After_Opening_Metric", 
-    "Refrigerate_After_Thawing_Min", "Refrigerate_After_Thawing_Max", "Refrigerate_After_Thawing_Metric", 
-    "Freeze_Min", "Freeze_Max", "Freeze_Metric", "Freeze_Tips", 
-    "DOP_Freeze_Min", "DOP_Freeze_Max", "DOP_Freeze_Metric", "DOP_Freeze_Tips"
-]
-
-# Load the CSV data into a DataFrame when the server starts, with only the relevant columns
-data = pd.read_csv(csv_path, usecols=valid_columns)
+# Upper bound on (name, location) pairs answered by one batch request
+MAX_BATCH_ITEMS = 1000
 
-# Helper function to get shelf life information for a specific location
-def get_shelf_life_info(row, location):
-    location_columns_map = {
-        'pantry': [
-            'Pantry_Min', 'Pantry_Max', 'Pantry_Metric', 'Pantry_tips',
-            'DOP_Pantry_Min', 'DOP_Pantry_Max', 'DOP_Pantry_Metric', 'DOP_Pantry_tips',
-            'Pantry_After_Opening_Min', 'Pantry_After_Opening_Max', 'Pantry_After_Opening_Metric'
-        ],
-        'fridge': [
-            'Refrigerate_Min', 'Refrigerate_Max', 'Refrigerate_Metric', 'Refrigerate_tips',
-            'DOP_Refrigerate_Min', 'DOP_Refrigerate_Max', 'DOP_Refrigerate_Metric', 'DOP_Refrigerate_tips',
-            'Refrigerate_After_Opening_Min', 'Refrigerate_After_Opening_Max', 'Refrigerate_After_Opening_Metric',
-            'Refrigerate_After_Thawing_Min', 'Refrigerate_After_Thawing_Max', 'Refrigerate_After_Thawing_Metric'
-        ],
-        'freezer': [
-            'Freeze_Min', 'Freeze_Max', 'Freeze_Metric', 'Freeze_Tips',
-            'DOP_Freeze_Min', 'DOP_Freeze_Max', 'DOP_Freeze_Metric', 'DOP_Freeze_Tips'
-        ]
+# Load the compiled FoodKeeper records when the server starts.
+# The artifact is rebuilt from the CSV automatically whenever the CSV changes.
+records = load_records()
+
+# Normalize a FoodKeeper or user-supplied string for index lookups
+def normalize_key(value):
+    if not isinstance(value, str):
+        return ''
+    return ' '.join(value.lower().split())
+
+# Split a comma-separated FoodKeeper field (Keywords, Name_subtitle) into normalized tokens
+def split_tokens(value):
+    if not isinstance(value, str):
+        return set()
+    return {token for token in (normalize_key(part) for part in value.split(',')) if token}
+
+# Build the lookup indexes once at load so each request is a dictionary hit
+def build_indexes(records):
+    name_index = {}
+    keyword_index = {}
+    summaries = {}
+
+    for record in records:
+        position = record.position
+        name_index.setdefault(normalize_key(record.Name), []).append(position)
+        for token in split_tokens(record.Keywords) | split_tokens(record.Name_subtitle):
+            keyword_index.setdefault(token, []).append(position)
+
+        summaries[position] = {
+            "Name": record.Name,
+            "Name_subtitle": record.Name_subtitle,
+            "Keywords": record.Keywords
+        }
+
+    name_index = {key: tuple(positions) for key, positions in name_index.items()}
+    keyword_index = {key: tuple(positions) for key, positions in keyword_index.items()}
+    return name_index, keyword_index, summaries
+
+name_index, keyword_index, option_summaries = build_indexes(records)
+
+# Strings each FoodKeeper row can be found by in the fuzzy matcher
+def build_match_entries(summaries):
+    entries = {}
+    for position, summary in summaries.items():
+        texts = [summary["Name"]]
+        if summary["Name_subtitle"]:
+            texts.append(f"{summary['Name']} {summary['Name_subtitle']}")
+        if summary["Keywords"]:
+            texts.extend(summary["Keywords"].split(','))
+        entries[position] = texts
+    return entries
+
+fuzzy_matcher = FuzzyMatcher(build_match_entries(option_summaries))
+
+# Resolve a normalized product name to FoodKeeper row positions, exact names first
+def find_positions(product_name):
+    return name_index.get(product_name) or keyword_index.get(product_name) or ()
+
+# Resolve a free-form item name ("chkn breast", "Bananas (organic)") to row positions.
+# Falls back to the fuzzy matcher and only returns a single row when the match is confident.
+@lru_cache(maxsize=4096)
+def resolve_positions(product_name):
+    positions = find_positions(normalize_key(product_name))
+    if positions:
+        return positions
+
+    match = fuzzy_matcher.best_match(product_name)
+    return (match,) if match is not None else ()
+
+# Durations normalized to days once, for vectorized expiry-date calculations
+expiration_engine = ExpirationEngine(column_values(records))
+
+# Memoized item name + location -> FoodKeeper row used for expiry dates
+@lru_cache(maxsize=4096)
+def resolve_expiry_position(item_name, loc_index):
+    return expiration_engine.pick_position(resolve_positions(item_name.strip().lower()), loc_index)
+
+# Columns that describe storage in each location
+location_columns_map = {
+    'pantry': [
+        'Pantry_Min', 'Pantry_Max', 'Pantry_Metric', 'Pantry_tips',
+        'DOP_Pantry_Min', 'DOP_Pantry_Max', 'DOP_Pantry_Metric', 'DOP_Pantry_tips',
+        'Pantry_After_Opening_Min', 'Pantry_After_Opening_Max', 'Pantry_After_Opening_Metric'
+    ],
+    'fridge': [
+        'Refrigerate_Min', 'Refrigerate_Max', 'Refrigerate_Metric', 'Refrigerate_tips',
+        'DOP_Refrigerate_Min', 'DOP_Refrigerate_Max', 'DOP_Refrigerate_Metric', 'DOP_Refrigerate_tips',
+        'Refrigerate_After_Opening_Min', 'Refrigerate_After_Opening_Max', 'Refrigerate_After_Opening_Metric',
+        'Refrigerate_After_Thawing_Min', 'Refrigerate_After_Thawing_Max', 'Refrigerate_After_Thawing_Metric'
+    ],
+    'freezer': [
+        'Freeze_Min', 'Freeze_Max', 'Freeze_Metric', 'Freeze_Tips',
+        'DOP_Freeze_Min', 'DOP_Freeze_Max', 'DOP_Freeze_Metric', 'DOP_Freeze_Tips'
+    ]
+}
+
+# Project every row onto each location once at load: position -> location -> non-empty columns
+def build_location_projections(records):
+    return {
+        record.position: {
+            location: {
+                col: getattr(record, col) for col in cols if getattr(record, col) is not None
+            }
+            for location, cols in location_columns_map.items()
+        }
+        for record in records
     }
 
-    try:
-        cols = location_columns_map[location]
-        storage_info = row[cols].dropna().to_dict()
-        return storage_info if storage_info else f"Not recommended to store in {location}"
-    except KeyError:
+location_projections = build_location_projections(records)
+
+# Helper function to get shelf life information for a specific location
+def get_shelf_life_info(position, location):
+    if location not in location_columns_map:
         raise ValueError(f"Invalid location: {location}")
 
+    storage_info = location_projections[position][location]
+    return storage_info if storage_info else f"Not recommended to store in {location}"
+
+# Look up shelf life for one (name, location) pair, returning the response body and status
+def lookup_shelf_life(product_name, location):
+    if not product_name:
+        return {"error": "Product name is required"}, 400
+    if not location:
+        return {"error": "Location is required"}, 400
+
+    positions = resolve_positions(product_name)
+
+    if not positions:
+        # Offer the closest fuzzy candidates, if any, so the user can pick one
+        candidates = fuzzy_matcher.search(product_name)
+        if candidates:
+            return {"options": [option_summaries[position] for position, _ in candidates]}, 200
+        return {"message": f"The item '{product_name}' is not currently in our shelf life dataset."}, 200
+
+    # Handle single match case
+    if len(positions) == 1:
+        try:
+            return get_shelf_life_info(positions[0], location), 200
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+    # Handle multiple matches case
+    return {"options": [option_summaries[position] for position in positions]}, 200
+
 # API endpoint to retrieve shelf life information for a product by name and location
 @shelf_life_bp.route('/shelf_life', methods=['GET'])
 def get_shelf_life():
     product_name = request.args.get('name', '').strip().lower()
     location = request.args.get('location', '').strip().lower()
 
+    body, status = lookup_shelf_life(product_name, location)
+    return jsonify(body), status
+
+# API endpoint to retrieve shelf life information for many items in one round trip.
+# Accepts {"items": [{"name": ..., "location": ...}, ...]}; with no items in the body,
+# the logged-in user's inventory rows are used instead.
+@shelf_life_bp.route('/shelf_life/batch', methods=['POST'])
+@login_required
+def get_shelf_life_batch():
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+
+    if items is None:
+        conn = get_db_connection()
+        rows = conn.execute(
+            'SELECT item_id, item_name, location FROM Items WHERE user_id = ? AND in_list = 0',
+            (session['user_id'],)
+        ).fetchall()
+        conn.close()
+        items = [{"item_id": row["item_id"], "name": row["item_name"], "location": row["location"]} for row in rows]
+
+    if not isinstance(items, list):
+        return jsonify({"error": "'items' must be a list of {name, location} objects."}), 400
+    if len(items) > MAX_BATCH_ITEMS:
+        return jsonify({"error": f"A batch may contain at most {MAX_BATCH_ITEMS} items."}), 400
+
+    results = []
+    for item in items:
+        if not isinstance(item, dict):
+            results.append({"result": {"error": "Each item must be an object."}, "status": 400})
+            continue
+        name = str(item.get('name') or '').strip().lower()
+        location = str(item.get('location') or '').strip().lower()
+        body, status = lookup_shelf_life(name, location)
+        entry = {"name": name, "location": location, "result": body, "status": status}
+        if 'item_id' in item:
+            entry["item_id"] = item['item_id']
+        results.append(entry)
+
+    return jsonify({"results": results}), 200
+
+# API endpoint to list ranked FoodKeeper candidates for a possibly misspelled item name
+@shelf_life_bp.route('/shelf_life/matches', methods=['GET'])
+def get_shelf_life_matches():
+    product_name = request.args.get('name', '').strip()
+    limit = request.args.get('limit', 5, type=int)
+
     if not product_name:
         return jsonify({"error": "Product name is required"}), 400
-    if not location:
-        return jsonify({"error": "Location is required"}), 400
 
-    product_data = data[data['Name'].str.lower() == product_name]
+    matches = [
+        dict(option_summaries[position], score=score)
+        for position, score in fuzzy_matcher.search(product_name, limit=max(1, min(limit, 25)))
+    ]
+    return jsonify({"matches": matches}), 200
+
+# API endpoint listing the user's inventory items that expire within `days` days, soonest first.
+# Already-expired items are included with a negative `days_left`.
+@shelf_life_bp.route('/expiring_items', methods=['GET'])
+@login_required
+def get_expiring_items():
+    # type=int would quietly fall back to the default for a value like 'abc'
+    try:
+        days = int(request.args.get('days', 7))
+    except ValueError:
+        days = None
+    if days is None or days < 0:
+        return create_error_response(400, "'days' must be a non-negative integer.")
 
-    if product_data.empty:
-        return jsonify({"message": f"The item '{product_name}' is not currently in our shelf life dataset."}), 200
+    conn = get_db_connection()
+    rows = conn.execute(
+        'SELECT item_id, item_name, category, quantity, item_state, location, '
+        'COALESCE(stored_at, created_at) AS stored_at '
+        'FROM Items WHERE user_id = ? AND in_list = 0 AND COALESCE(stored_at, created_at) IS NOT NULL',
+        (session['user_id'],)
+    ).fetchall()
+    conn.close()
 
-    # Handle single match case
-    if len(product_data) == 1:
-        selected_item = product_data.iloc[0]
-        shelf_life_info = get_shelf_life_info(selected_item, location)
-        if "error" in shelf_life_info:
-            return jsonify(shelf_life_info), 400
+    items, positions, loc_indexes, stored_dates = [], [], [], []
+    for row in rows:
+        loc_index = ExpirationEngine.location_index(row['location'])
+        if loc_index is None:
+            continue
+        position = resolve_expiry_position(row['item_name'], loc_index)
+        if position is None:
+            continue
+        items.append(row)
+        positions.append(position)
+        loc_indexes.append(loc_index)
+        stored_dates.append(row['stored_at'][:10])
 
-        return jsonify(shelf_life_info)
+    if not items:
+        return jsonify({"days": days, "items": []}), 200
 
-    # Handle multiple matches case
-    selection_summary = [
-        {
-            "Name": row["Name"],
-            "Name_subtitle": row.get("Name_subtitle"),  
-            "Keywords": row.get("Keywords")          
-        }
-        for _, row in product_data.iterrows()
+    min_dates, max_dates = expiration_engine.expiry_dates(
+        positions, loc_indexes, np.array(stored_dates, dtype='datetime64[D]')
+    )
+    today = np.datetime64('today', 'D')
+    days_left = (min_dates - today).astype('timedelta64[D]')
+
+    selected = np.flatnonzero(~np.isnat(min_dates) & (min_dates <= today + np.timedelta64(days, 'D')))
+    ordered = selected[np.argsort(min_dates[selected], kind='stable')]
+
+    expiring = [
+        dict(
+            items[index],
+            expires_min=str(min_dates[index]),
+            expires_max=None if np.isnat(max_dates[index]) else str(max_dates[index]),
+            days_left=int(days_left[index].astype(np.int64))
+        )
+        for index in ordered
     ]
-    return jsonify({"options": selection_summary}), 200
\ No newline at end of file
+    return jsonify({"days": days, "items": expiring}), 200
@@ -0,0 +1,248 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from services.database import get_db_connection
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Prune expired and surplus rows of a namespace after this many writes
+PRUNE_EVERY_WRITES = 100
+
+# Keys looked up per SELECT by get_many, well under SQLite's bound-parameter limit
+GET_MANY_CHUNK_SIZE = 500
+
+# Every cache created in this process, by namespace
+_caches = {}
+
+
+def normalize_key(text):
+    """Lowercase a free-text key and collapse its whitespace, so 'Milk ' and 'milk' share an entry."""
+    return ' '.join(str(text).lower().split())
+
+
+class PersistentCache:
+    """
+    Two-level cache for JSON-serializable values.
+
+    An in-process LRU (OrderedDict) answers repeated lookups without touching the
+    database; misses fall through to the CacheEntries table (see the migrations in
+    database/query_groceru.py), so entries survive restarts and are shared by workers.
+    Entries expire `ttl` seconds after being written. The LRU holds at most
+    `maxsize` entries and the table at most `max_rows` rows per namespace.
+    With `persist=False` the cache is memory-only and never touches the database.
+    Database errors are logged and treated as misses, so the cache never breaks a request.
+    """
+
+    def __init__(self, namespace, maxsize=1024, ttl=30 * 24 * 3600, max_rows=50000, persist=True):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.persist = persist
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "expired": 0,
+            "db_errors": 0
+        }
+        _caches[namespace] = self
+
+    def _count(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def _remember(self, key, expires_at, value):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get(self, key, default=None):
+        key = normalize_key(key)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self._stats["expired"] += 1
+
+        if not self.persist:
+            self._count("misses")
+            return default
+
+        try:
+            conn = get_db_connection()
+            try:
+                row = conn.execute(
+                    'SELECT value, expires_at FROM CacheEntries WHERE namespace = ? AND cache_key = ? AND expires_at > ?',
+                    (self.namespace, key, now)
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Cache '{self.namespace}' read failed: {str(e)}")
+            self._count("db_errors")
+            row = None
+
+        if row is None:
+            self._count("misses")
+            return default
+
+        value = json.loads(row["value"])
+        self._remember(key, row["expires_at"], value)
+        self._count("db_hits")
+        return value
+
+    def get_many(self, keys):
+        """
+        Return {normalized key: value} for the keys that are cached; misses are left out.
+        Keys missing from the LRU are read with one SELECT per GET_MANY_CHUNK_SIZE keys.
+        """
+        keys = list(dict.fromkeys(normalize_key(key) for key in keys))
+        now = time.time()
+        found = {}
+        remaining = []
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry[0] > now:
+                        self._entries.move_to_end(key)
+                        self._stats["memory_hits"] += 1
+                        found[key] = entry[1]
+                        continue
+                    del self._entries[key]
+                    self._stats["expired"] += 1
+                remaining.append(key)
+
+        rows = []
+        if self.persist and remaining:
+            try:
+                conn = get_db_connection()
+                try:
+                    for start in range(0, len(remaining), GET_MANY_CHUNK_SIZE):
+                        chunk = remaining[start:start + GET_MANY_CHUNK_SIZE]
+                        rows.extend(conn.execute(
+                            'SELECT cache_key, value, expires_at FROM CacheEntries '
+                            'WHERE namespace = ? AND expires_at > ? AND cache_key IN ({})'.format(','.join(['?'] * len(chunk))),
+                            [self.namespace, now] + chunk
+                        ).fetchall())
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                logger.error(f"Cache '{self.namespace}' read failed: {str(e)}")
+                self._count("db_errors")
+                rows = []
+
+        for row in rows:
+            value = json.loads(row["value"])
+            self._remember(row["cache_key"], row["expires_at"], value)
+            found[row["cache_key"]] = value
+
+        with self._lock:
+            self._stats["db_hits"] += len(rows)
+            self._stats["misses"] += len(remaining) - len(rows)
+        return found
+
+    def set(self, key, value):
+        self.set_many({key: value})
+
+    def set_many(self, values):
+        """Store several entries with one database transaction."""
+        expires_at = time.time() + self.ttl
+        rows = []
+        for key, value in values.items():
+            key = normalize_key(key)
+            self._remember(key, expires_at, value)
+            rows.append((self.namespace, key, json.dumps(value), expires_at))
+        if not rows:
+            return
+
+        with self._lock:
+            self._stats["writes"] += len(rows)
+            self._writes += len(rows)
+            prune = self._writes >= PRUNE_EVERY_WRITES
+            if prune:
+                self._writes = 0
+
+        if not self.persist:
+            return
+
+        try:
+            conn = get_db_connection()
+            try:
+                conn.executemany(
+                    '''INSERT INTO CacheEntries (namespace, cache_key, value, expires_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(namespace, cache_key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at''',
+                    rows
+                )
+                if prune:
+                    self._prune(conn)
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Cache '{self.namespace}' write failed: {str(e)}")
+            self._count("db_errors")
+
+    def _prune(self, conn):
+        # Drop expired rows, then the soonest-expiring (oldest) rows beyond max_rows
+        conn.execute(
+            'DELETE FROM CacheEntries WHERE namespace = ? AND expires_at <= ?',
+            (self.namespace, time.time())
+        )
+        conn.execute(
+            '''DELETE FROM CacheEntries WHERE namespace = ? AND cache_key IN (
+                SELECT cache_key FROM CacheEntries WHERE namespace = ?
+                ORDER BY expires_at DESC LIMIT -1 OFFSET ?)''',
+            (self.namespace, self.namespace, self.max_rows)
+        )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if not self.persist:
+            return
+        conn = get_db_connection()
+        try:
+            conn.execute('DELETE FROM CacheEntries WHERE namespace = ?', (self.namespace,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["memory_hits"] + self._stats["db_hits"] + self._stats["misses"]
+            hits = self._stats["memory_hits"] + self._stats["db_hits"]
+            return dict(
+                self._stats,
+                namespace=self.namespace,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+                ttl=self.ttl,
+                persist=self.persist,
+                hit_rate=round(hits / lookups, 4) if lookups else None
+            )
+
+
+def cache_stats():
+    """Statistics for every cache created in this process."""
+    return [cache.stats() for cache in list(_caches.values())]
@@ -0,0 +1,57 @@
+import hashlib
+from functools import wraps
+from flask import make_response, request, session
+from services.database import get_db_connection
+
+# Data scopes tracked in UserDataVersions (see the migrations in database/query_groceru.py)
+SCOPES = ('items', 'recipes')
+
+
+def get_data_version(conn, user_id, scope):
+    """
+    Return the user's current version counter for `scope`.
+    Triggers bump it on every insert, update or delete of the user's rows.
+    """
+    row = conn.execute(
+        f'SELECT {scope}_version FROM UserDataVersions WHERE user_id = ?', (user_id,)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def build_etag(scope, user_id, version):
+    # The query string is part of the tag: filters, projections and pages differ in content
+    key = f"{scope}:{user_id}:{version}:{request.full_path}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def conditional_get(scope):
+    """
+    Decorator for GET list endpoints backed by one data scope.
+    Answers `If-None-Match` with 304 Not Modified after a single primary-key
+    lookup of the version counter, without running the view or reading any rows.
+    Successful responses carry the ETag so clients can revalidate next time.
+    """
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown data scope: {scope}")
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            user_id = session['user_id']
+            conn = get_db_connection()
+            version = get_data_version(conn, user_id, scope)
+            conn.close()
+
+            etag = build_etag(scope, user_id, version)
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+                response.set_etag(etag)
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -1,12 +1,227 @@
 import os
 import sqlite3
+import threading
+import time
+from flask import g, has_app_context
+from services import metrics, sql_trace
+
+# Connection pool tuning, overridable from the environment
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '8'))                      # Idle connections kept per database
+DB_CACHE_SIZE_KB = int(os.getenv('DB_CACHE_SIZE_KB', '16384'))          # Page cache per connection
+DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', str(256 * 1024 * 1024)))  # Bytes of the file to memory-map
+DB_BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', '5000'))      # Wait this long on a locked database
+
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    Cursor that times each statement: durations go to the metrics registry, slow
+    statements to the slow-query log and, with SQL_TRACE on, every statement to
+    the current request's trace (see services/sql_trace.py).
+    """
+
+    def _timed(self, run, sql, args, plan_parameters=None):
+        operation = metrics.sql_operation(sql)
+        if sql_trace.SQL_TRACE:
+            sql_trace.start_statement()
+        start = time.perf_counter()
+        try:
+            return run(sql, *args)
+        except sqlite3.Error:
+            metrics.db_errors.inc(operation)
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            metrics.db_latency.observe(duration, operation)
+            sql_trace.finish_statement(self.connection, sql, plan_parameters, duration)
+
+    def execute(self, sql, parameters=()):
+        return self._timed(super().execute, sql, (parameters,), parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(super().executemany, sql, (seq_of_parameters,))
+
+    def executescript(self, sql_script):
+        return self._timed(super().executescript, sql_script, ())
+
+
+class PooledConnection:
+    """
+    Thin proxy around a sqlite3.Connection handed out by the pool.
+    Everything is delegated to the real connection except close(),
+    which returns the connection to the pool instead of closing it.
+    """
+
+    def __init__(self, conn, pool):
+        self._conn = conn
+        self._pool = pool
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    # Statements go through TimedCursor so query latency is measured per statement
+    def cursor(self, factory=TimedCursor):
+        return self._conn.cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._conn.__exit__(exc_type, exc_value, traceback)
+
+    @property
+    def released(self):
+        return self._released
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.release(self._conn)
+
+
+class ConnectionPool:
+    """
+    Pool of SQLite connections for one database file.
+    Connections are configured once (WAL, synchronous=NORMAL, cache/mmap sizes,
+    busy timeout) and reused across requests. Up to `size` idle connections are kept;
+    extra connections opened under load are closed when released.
+    """
+
+    def __init__(self, path, size=DB_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = []
+        self._lock = threading.Lock()
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "released": 0,
+            "discarded": 0,
+            "rolled_back": 0,
+            "in_use": 0
+        }
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute(f'PRAGMA cache_size = -{DB_CACHE_SIZE_KB}')
+        conn.execute(f'PRAGMA mmap_size = {DB_MMAP_SIZE}')
+        conn.execute(f'PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}')
+        if sql_trace.SQL_TRACE:
+            conn.set_trace_callback(sql_trace.trace_statement)
+        return conn
+
+    def acquire(self):
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+            self._stats["in_use"] += 1
+            if conn is not None:
+                self._stats["reused"] += 1
+                return conn
+            self._stats["created"] += 1
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._stats["in_use"] -= 1
+            raise
+
+    def release(self, conn):
+        # Never hand the next request a half-finished transaction
+        if conn.in_transaction:
+            conn.rollback()
+            rolled_back = True
+        else:
+            rolled_back = False
+
+        with self._lock:
+            self._stats["in_use"] -= 1
+            self._stats["released"] += 1
+            if rolled_back:
+                self._stats["rolled_back"] += 1
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+            self._stats["discarded"] += 1
+        conn.close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, idle=len(self._idle), size=self.size)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+# Connections inherited from a parent process; kept referenced so they are never closed here
+_inherited_connections = []
+
+
+def _database_path():
+    database_url = os.getenv('DATABASE_URL')
+    return database_url.replace('sqlite:///', '')
+
+
+def _reset_after_fork():
+    # A SQLite connection must not be used across fork(): a forked worker (e.g. a
+    # gunicorn worker with preload_app) starts with empty pools and opens its own.
+    # Closing the parent's connections here could disturb its locks, so they are only dropped.
+    global _pools, _pools_lock, _pools_pid
+    for pool in _pools.values():
+        _inherited_connections.extend(pool._idle)
+    _pools = {}
+    _pools_lock = threading.Lock()
+    _pools_pid = os.getpid()
+
+
+def get_pool(path=None):
+    if _pools_pid != os.getpid():
+        _reset_after_fork()
+    path = path or _database_path()
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(path, ConnectionPool(path))
+    return pool
+
 
 def get_db_connection():
     """
-    Establish and return a connection to the SQLite database.
+    Return a pooled connection to the SQLite database.
     The database is located in the 'database' folder.
+    Calling close() on the connection returns it to the pool; connections a
+    request forgets to close are returned by the teardown hook from init_app().
     """
-    database_url = os.getenv('DATABASE_URL')  
-    conn = sqlite3.connect(database_url.replace('sqlite:///', '')) 
-    conn.row_factory = sqlite3.Row
-    return conn
\ No newline at end of file
+    pool = get_pool()
+    conn = PooledConnection(pool.acquire(), pool)
+    if has_app_context():
+        g.setdefault('_db_connections', []).append(conn)
+    return conn
+
+
+def release_request_connections(exception=None):
+    """Return every connection still checked out by the current app context to its pool."""
+    for conn in g.pop('_db_connections', []):
+        conn.close()
+
+
+def pool_stats():
+    """Per-database pool statistics."""
+    return [pool.stats() for pool in list(_pools.values())]
+
+
+def init_app(app):
+    app.teardown_appcontext(release_request_connections)
@@ -0,0 +1,141 @@
+import logging
+import os
+import threading
+import time
+import requests
+from services.cache import PersistentCache
+from services.http_client import get_session
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Overridable so benchmarks can point searches at a local stand-in
+EDAMAM_SEARCH_URL = os.getenv('EDAMAM_API_URL', 'https://api.edamam.com/search')
+
+# Response cache tuning, overridable from the environment
+EDAMAM_CACHE_SIZE = int(os.getenv('EDAMAM_CACHE_SIZE', '512'))                 # Searches held in memory
+EDAMAM_CACHE_TTL = int(os.getenv('EDAMAM_CACHE_TTL', '3600'))                  # Seconds a response is fresh
+EDAMAM_CACHE_STALE_TTL = int(os.getenv('EDAMAM_CACHE_STALE_TTL', '86400'))     # Further seconds it may be served while refreshing
+EDAMAM_CACHE_PERSIST = os.getenv('EDAMAM_CACHE_PERSIST', 'True') == 'True'     # Keep responses in the database across restarts
+
+# Only the recipe fields the routes use are cached; full Edamam hits are large
+RECIPE_FIELDS = ('label', 'url', 'image', 'calories', 'dietLabels', 'ingredientLines')
+
+search_cache = PersistentCache(
+    'edamam_search', EDAMAM_CACHE_SIZE, EDAMAM_CACHE_TTL + EDAMAM_CACHE_STALE_TTL,
+    persist=EDAMAM_CACHE_PERSIST
+)
+
+_key_locks = {}          # cache key -> lock held while that search is fetched
+_refreshing = set()      # cache keys with a background refresh in flight
+_state_lock = threading.Lock()
+_stats = {"fetches": 0, "fresh_hits": 0, "stale_hits": 0, "refreshes": 0, "refresh_errors": 0}
+
+
+def _normalize_value(value):
+    return ' '.join(str(value).lower().split())
+
+
+def cache_key(params):
+    """
+    Canonical key for a set of search parameters: names sorted, values lowercased
+    with whitespace collapsed, list values sorted and empty values dropped,
+    so equivalent searches share an entry. Credentials are never part of the key.
+    """
+    parts = []
+    for name in sorted(params):
+        value = params[name]
+        if isinstance(value, (list, tuple, set)):
+            values = sorted({_normalize_value(item) for item in value if item not in (None, '')})
+        else:
+            values = [_normalize_value(value)] if value not in (None, '') else []
+        parts.extend(f"{name}={item}" for item in values if item)
+    return '&'.join(parts)
+
+
+def _query(params):
+    # Drop empty filters so '' and [] behave like a missing parameter; q is always sent
+    query = {name: value for name, value in params.items() if name == 'q' or value not in (None, '', [])}
+    query['app_id'] = os.getenv('EDAMAM_APP_ID')
+    query['app_key'] = os.getenv('EDAMAM_APP_KEY')
+    return query
+
+
+def _fetch(key, params):
+    # Shared keep-alive session: default connect/read timeouts and retries for GETs
+    response = get_session().get(EDAMAM_SEARCH_URL, params=_query(params))
+    response.raise_for_status()
+    hits = [
+        {"recipe": {field: hit['recipe'].get(field) for field in RECIPE_FIELDS}}
+        for hit in response.json().get('hits', [])
+    ]
+    search_cache.set(key, {"fetched_at": time.time(), "hits": hits})
+    with _state_lock:
+        _stats["fetches"] += 1
+    return hits
+
+
+def _refresh(key, params):
+    try:
+        _fetch(key, params)
+        with _state_lock:
+            _stats["refreshes"] += 1
+    except requests.exceptions.RequestException as e:
+        logger.warning("Background refresh of Edamam search '%s' failed: %s", key, e)
+        with _state_lock:
+            _stats["refresh_errors"] += 1
+    finally:
+        with _state_lock:
+            _refreshing.discard(key)
+
+
+def _schedule_refresh(key, params):
+    with _state_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    threading.Thread(target=_refresh, args=(key, params), daemon=True).start()
+
+
+def search(params):
+    """
+    Return the Edamam search hits for `params` (e.g. {'q': 'chicken', 'health': 'vegan'}).
+
+    Fresh cached responses are returned without a request. Responses past
+    EDAMAM_CACHE_TTL but within EDAMAM_CACHE_STALE_TTL are returned immediately
+    while one background request refreshes them. Concurrent misses for the same
+    search wait for a single upstream request instead of each calling Edamam.
+    Raises requests.exceptions.RequestException when Edamam cannot be reached
+    and nothing usable is cached.
+    """
+    key = cache_key(params)
+
+    entry = search_cache.get(key)
+    if entry is not None:
+        age = time.time() - entry["fetched_at"]
+        if age < EDAMAM_CACHE_TTL:
+            with _state_lock:
+                _stats["fresh_hits"] += 1
+            return entry["hits"]
+        with _state_lock:
+            _stats["stale_hits"] += 1
+        _schedule_refresh(key, params)
+        return entry["hits"]
+
+    with _state_lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        # Another request may have fetched this search while we waited
+        entry = search_cache.get(key)
+        if entry is not None:
+            return entry["hits"]
+        try:
+            return _fetch(key, params)
+        finally:
+            with _state_lock:
+                _key_locks.pop(key, None)
+
+
+def search_stats():
+    with _state_lock:
+        return dict(_stats, refreshing=len(_refreshing))
@@ -0,0 +1,121 @@
+import numpy as np
+
+# Storage locations in the order of the engine's array columns
+LOCATIONS = ('pantry', 'fridge', 'freezer')
+
+# FoodKeeper duration columns per location, most relevant first.
+# Items are timestamped when they enter the inventory, so "from date of purchase"
+# ranges win over "from best-by date" and "after opening" ranges.
+LOCATION_SOURCES = {
+    'pantry': ('DOP_Pantry', 'Pantry', 'Pantry_After_Opening'),
+    'fridge': ('DOP_Refrigerate', 'Refrigerate', 'Refrigerate_After_Opening', 'Refrigerate_After_Thawing'),
+    'freezer': ('DOP_Freeze', 'Freeze'),
+}
+
+# Conversion factors from FoodKeeper metrics to days. Metrics such as
+# 'When Ripe', 'Indefinitely' or 'Package use-by date' have no fixed duration.
+METRIC_DAYS = {
+    'hours': 1 / 24,
+    'days': 1,
+    'weeks': 7,
+    'months': 30,
+    'year': 365,
+    'years': 365,
+}
+
+
+def _to_float_array(values):
+    result = np.full(len(values), np.nan)
+    for index, value in enumerate(values):
+        try:
+            result[index] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return result
+
+
+def _metric_factor_array(values):
+    result = np.full(len(values), np.nan)
+    for index, value in enumerate(values):
+        if isinstance(value, str):
+            result[index] = METRIC_DAYS.get(value.strip().lower(), np.nan)
+    return result
+
+
+class ExpirationEngine:
+    """
+    Vectorized expiry-date calculator over the FoodKeeper dataset.
+
+    Every duration is normalized to days once, into (rows x locations) arrays,
+    so computing expiry dates for a whole inventory is a handful of NumPy operations.
+    """
+
+    def __init__(self, columns):
+        """
+        `columns` maps FoodKeeper column names to equal-length lists, one value
+        per FoodKeeperRecord (the __slots__ rows of services/foodkeeper.py),
+        as built by foodkeeper.column_values(records). Missing values are None.
+        """
+        row_count = len(columns['Name'])
+        self.min_days = np.full((row_count, len(LOCATIONS)), np.nan)
+        self.max_days = np.full((row_count, len(LOCATIONS)), np.nan)
+
+        for loc_index, location in enumerate(LOCATIONS):
+            for prefix in LOCATION_SOURCES[location]:
+                factor = _metric_factor_array(columns[f'{prefix}_Metric'])
+                low = _to_float_array(columns[f'{prefix}_Min']) * factor
+                high = _to_float_array(columns[f'{prefix}_Max']) * factor
+                high = np.where(np.isnan(high), low, high)
+
+                # Only fill rows that no higher-priority source has covered yet
+                missing = np.isnan(self.min_days[:, loc_index])
+                self.min_days[:, loc_index] = np.where(missing, low, self.min_days[:, loc_index])
+                self.max_days[:, loc_index] = np.where(missing, high, self.max_days[:, loc_index])
+
+    @staticmethod
+    def location_index(location):
+        """Return the array column for an Items location ('Fridge', 'pantry', ...), or None."""
+        if not isinstance(location, str):
+            return None
+        try:
+            return LOCATIONS.index(location.strip().lower())
+        except ValueError:
+            return None
+
+    def pick_position(self, positions, loc_index):
+        """
+        Pick the FoodKeeper row to use for an ambiguous name: the candidate
+        with the shortest known shelf life in that location, or None.
+        """
+        if not positions:
+            return None
+        if len(positions) == 1:
+            return positions[0]
+        candidates = self.min_days[list(positions), loc_index]
+        if np.all(np.isnan(candidates)):
+            return positions[0]
+        return positions[int(np.nanargmin(candidates))]
+
+    def expiry_dates(self, positions, loc_indexes, stored_dates):
+        """
+        Compute expiry dates for many items in one pass.
+
+        `positions` and `loc_indexes` are integer arrays into the engine's rows and
+        locations; `stored_dates` is a datetime64[D] array. Returns (min_dates, max_dates)
+        as datetime64[D] arrays with NaT where the dataset has no fixed duration.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        loc_indexes = np.asarray(loc_indexes, dtype=np.int64)
+        stored_days = np.asarray(stored_dates, dtype='datetime64[D]').astype(np.int64).astype(float)
+
+        min_days = self.min_days[positions, loc_indexes]
+        max_days = self.max_days[positions, loc_indexes]
+
+        return _days_to_dates(stored_days + np.floor(min_days)), _days_to_dates(stored_days + np.floor(max_days))
+
+
+def _days_to_dates(epoch_days):
+    dates = np.full(epoch_days.shape, np.datetime64('NaT'), dtype='datetime64[D]')
+    known = ~np.isnan(epoch_days)
+    dates[known] = epoch_days[known].astype(np.int64).astype('datetime64[D]')
+    return dates
@@ -0,0 +1,172 @@
+import csv
+import hashlib
+import os
+import sqlite3
+import tempfile
+
+DATABASE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database')
+
+# Source CSV and the compiled artifact served at runtime
+CSV_PATH = os.getenv('FOODKEEPER_CSV_PATH', os.path.join(DATABASE_DIR, 'FoodKeeper-Data.csv'))
+ARTIFACT_PATH = os.getenv('FOODKEEPER_ARTIFACT_PATH', os.path.join(DATABASE_DIR, 'foodkeeper.db'))
+
+# Bump when the artifact layout changes so stale artifacts are rebuilt
+ARTIFACT_VERSION = 1
+
+TEXT_COLUMNS = (
+    "Name", "Name_subtitle", "Keywords",
+    "Pantry_Metric", "Pantry_tips",
+    "DOP_Pantry_Metric", "DOP_Pantry_tips",
+    "Pantry_After_Opening_Metric",
+    "Refrigerate_Metric", "Refrigerate_tips",
+    "DOP_Refrigerate_Metric", "DOP_Refrigerate_tips",
+    "Refrigerate_After_Opening_Metric",
+    "Refrigerate_After_Thawing_Metric",
+    "Freeze_Metric", "Freeze_Tips",
+    "DOP_Freeze_Metric", "DOP_Freeze_Tips"
+)
+
+# List of columns served by the API, excluding Category_ID and ID
+VALID_COLUMNS = (
+    "Name", "Name_subtitle", "Keywords",
+    "Pantry_Min", "Pantry_Max", "Pantry_Metric", "Pantry_tips",
+    "DOP_Pantry_Min", "DOP_Pantry_Max", "DOP_Pantry_Metric", "DOP_Pantry_tips",
+    "Pantry_After_Opening_Min", "Pantry_After_Opening_Max", "Pantry_After_Opening_Metric",
+    "Refrigerate_Min", "Refrigerate_Max", "Refrigerate_Metric", "Refrigerate_tips",
+    "DOP_Refrigerate_Min", "DOP_Refrigerate_Max", "DOP_Refrigerate_Metric", "DOP_Refrigerate_tips",
+    "Refrigerate_After_Opening_Min", "Refrigerate_After_Opening_Max", "Refrigerate_After_Opening_Metric",
+    "Refrigerate_After_Thawing_Min", "Refrigerate_After_Thawing_Max", "Refrigerate_After_Thawing_Metric",
+    "Freeze_Min", "Freeze_Max", "Freeze_Metric", "Freeze_Tips",
+    "DOP_Freeze_Min", "DOP_Freeze_Max", "DOP_Freeze_Metric", "DOP_Freeze_Tips"
+)
+
+ALL_COLUMNS = ("ID", "Category_ID") + VALID_COLUMNS
+
+
+def _column_type(column):
+    if column in ("ID", "Category_ID"):
+        return "INTEGER"
+    return "TEXT" if column in TEXT_COLUMNS else "REAL"
+
+
+class FoodKeeperRecord:
+    """
+    One FoodKeeper row. Attributes are the CSV column names; missing values are None.
+    `position` is the record's index in the list returned by load_records().
+    """
+    __slots__ = ('position',) + ALL_COLUMNS
+
+    def __init__(self, position, values):
+        self.position = position
+        for column, value in zip(ALL_COLUMNS, values):
+            setattr(self, column, value)
+
+
+def csv_fingerprint(csv_path=CSV_PATH):
+    with open(csv_path, 'rb') as csv_file:
+        return f"v{ARTIFACT_VERSION}:{hashlib.sha256(csv_file.read()).hexdigest()}"
+
+
+def _convert(column, raw):
+    raw = (raw or '').strip()
+    if not raw:
+        return None
+    column_type = _column_type(column)
+    try:
+        if column_type == "INTEGER":
+            return int(float(raw))
+        if column_type == "REAL":
+            return float(raw)
+    except ValueError:
+        return None
+    return raw
+
+
+def compile_artifact(csv_path=CSV_PATH, artifact_path=ARTIFACT_PATH):
+    """
+    Compile the FoodKeeper CSV into a typed SQLite artifact.
+    The artifact is written to a temporary file and swapped in atomically,
+    so concurrent workers never read a half-written file.
+    """
+    fingerprint = csv_fingerprint(csv_path)
+    with open(csv_path, newline='', encoding='utf-8-sig') as csv_file:
+        rows = [
+            tuple(_convert(column, row.get(column)) for column in ALL_COLUMNS)
+            for row in csv.DictReader(csv_file)
+            if (row.get('Name') or '').strip()  # Skip the blank spacer rows
+        ]
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(artifact_path), suffix='.tmp')
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(temp_path)
+        column_defs = ', '.join(f'"{column}" {_column_type(column)}' for column in ALL_COLUMNS)
+        conn.execute(f'CREATE TABLE foodkeeper (position INTEGER PRIMARY KEY, {column_defs})')
+        conn.executemany(
+            f'INSERT INTO foodkeeper VALUES (?, {", ".join("?" * len(ALL_COLUMNS))})',
+            [(position,) + row for position, row in enumerate(rows)]
+        )
+        conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+        conn.execute("INSERT INTO meta VALUES ('fingerprint', ?)", (fingerprint,))
+        conn.commit()
+        conn.close()
+        os.replace(temp_path, artifact_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return len(rows)
+
+
+def _artifact_fingerprint(artifact_path):
+    try:
+        conn = sqlite3.connect(f'file:{artifact_path}?mode=ro', uri=True)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def ensure_artifact(csv_path=CSV_PATH, artifact_path=ARTIFACT_PATH):
+    """
+    Rebuild the artifact when it is missing or the CSV has changed since it was built.
+    A missing CSV is fine as long as a compiled artifact exists.
+    """
+    csv_exists = os.path.isfile(csv_path)
+    if not csv_exists:
+        if not os.path.isfile(artifact_path):
+            raise FileNotFoundError(
+                f"Neither the FoodKeeper CSV ({csv_path}) nor its compiled artifact ({artifact_path}) was found."
+            )
+        return False
+
+    if os.path.isfile(artifact_path) and _artifact_fingerprint(artifact_path) == csv_fingerprint(csv_path):
+        return False
+
+    compile_artifact(csv_path, artifact_path)
+    return True
+
+
+def load_records(csv_path=CSV_PATH, artifact_path=ARTIFACT_PATH):
+    """Return the FoodKeeper rows as a list of FoodKeeperRecord, rebuilding the artifact if stale."""
+    ensure_artifact(csv_path, artifact_path)
+    conn = sqlite3.connect(f'file:{artifact_path}?mode=ro', uri=True)
+    try:
+        quoted = ', '.join(f'"{column}"' for column in ALL_COLUMNS)
+        rows = conn.execute(f'SELECT position, {quoted} FROM foodkeeper ORDER BY position').fetchall()
+    finally:
+        conn.close()
+    return [FoodKeeperRecord(row[0], row[1:]) for row in rows]
+
+
+def column_values(records, columns=ALL_COLUMNS):
+    """Return {column: [value per record]} for column-oriented consumers."""
+    return {column: [getattr(record, column) for record in records] for column in columns}
+
+
+if __name__ == '__main__':
+    count = compile_artifact()
+    print(f"Compiled {count} FoodKeeper rows into {ARTIFACT_PATH}")
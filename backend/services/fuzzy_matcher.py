@@ -0,0 +1,201 @@
+import re
+from collections import Counter
+from functools import lru_cache
+
+# Parenthetical notes and anything that is not a letter or a space are noise for matching
+_PARENTHETICAL = re.compile(r'\(.*?\)')
+_NON_ALPHA = re.compile(r'[^a-z ]+')
+
+
+def normalize_text(text):
+    """
+    Lowercase a name, drop parenthetical notes such as '(organic)',
+    strip punctuation/digits and collapse whitespace.
+    """
+    if not isinstance(text, str):
+        return ''
+    text = _PARENTHETICAL.sub(' ', text.lower())
+    text = _NON_ALPHA.sub(' ', text)
+    return ' '.join(text.split())
+
+
+def char_ngrams(text, size=3):
+    """
+    Return the set of character n-grams of a normalized string.
+    Each word is padded with spaces so word starts and ends carry weight.
+    """
+    grams = set()
+    for word in text.split():
+        padded = f" {word} "
+        if len(padded) <= size:
+            grams.add(padded)
+            continue
+        for start in range(len(padded) - size + 1):
+            grams.add(padded[start:start + size])
+    return grams
+
+
+# Words that say nothing about what an item is ("broccoli and broccoli raab")
+STOP_WORDS = frozenset({'a', 'an', 'and', 'as', 'etc', 'for', 'in', 'of', 'or', 'such', 'the', 'with'})
+
+WORD_MIN_SIMILARITY = 0.5      # N-gram Dice below which two words are unrelated ("batteries" vs "berries")
+ABBREVIATION_SIMILARITY = 0.8  # A word spelled with some letters left out ("chkn" for "chicken")
+HEAD_WORD_WEIGHT = 2.0         # The last word names the item ("breast" in "chkn breast")
+EXTRA_WORD_PENALTY = 0.12      # Share of the score lost per name word the query does not mention
+MIN_NAME_FACTOR = 0.5          # Floor of that penalty for long names
+KEYWORD_ONLY_FACTOR = 0.75     # Applied when the query mentions no word of the entry's name ("spinach" -> Lettuce)
+
+
+def singular(word):
+    """Crude singular form so 'tomatoes', 'tomatos' and 'tomato' compare equal."""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 4 and word.endswith(('oes', 'ches', 'shes', 'sses', 'xes')):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def content_words(text):
+    """Words of a normalized string without stop words (all words if nothing else is left)."""
+    words = text.split()
+    return [word for word in words if word not in STOP_WORDS] or words
+
+
+def _is_abbreviation(short, word):
+    # Same first letter and every letter of `short` appears in `word`, in order
+    if len(short) < 3 or len(short) >= len(word) or short[0] != word[0]:
+        return False
+    letters = iter(word)
+    return all(letter in letters for letter in short)
+
+
+class FuzzyMatcher:
+    """
+    Typo-tolerant, word-aware matcher.
+
+    `entries` maps an entry ID to the strings it should be found by, its name
+    first (e.g. a FoodKeeper row's name, name + subtitle and keywords).
+    Each query word is matched to the entries' words: a whole word or its
+    singular/plural counts fully, a misspelling counts by the Dice coefficient of
+    character n-grams (found through an inverted index over the vocabulary) and
+    an abbreviation such as "chkn" counts as ABBREVIATION_SIMILARITY.
+    An entry scores the weighted share of query words it matches, the last
+    (head) word weighing HEAD_WORD_WEIGHT, reduced by EXTRA_WORD_PENALTY for
+    each word of its name (or of the closest comma-separated part of its name)
+    that the query does not mention. So "cheddar cheese" prefers Cheese over
+    Vegan Cheddar Cheese, and "dish soap" matches nothing.
+    """
+
+    def __init__(self, entries, ngram_size=3, cache_size=4096):
+        self.ngram_size = ngram_size
+        self._word_entries = {}    # vocabulary word -> set of entry IDs
+        self._name_parts = {}      # entry ID -> content words of its name and of each comma-separated part
+        self._singular_words = {}  # singular form -> vocabulary words
+        self._word_postings = {}   # n-gram -> tuple of vocabulary words
+        self._word_sizes = {}      # vocabulary word -> number of n-grams
+
+        for entry_id, texts in entries.items():
+            for index, text in enumerate(texts):
+                normalized = normalize_text(text)
+                if not normalized:
+                    continue
+                words = content_words(normalized)
+                if index == 0:
+                    parts = [normalized] + [normalize_text(part) for part in text.split(',')]
+                    self._name_parts[entry_id] = tuple(
+                        tuple(dict.fromkeys(content_words(part))) for part in dict.fromkeys(parts) if part
+                    )
+                for word in words:
+                    self._word_entries.setdefault(word, set()).add(entry_id)
+
+        postings = {}
+        for word in self._word_entries:
+            self._singular_words.setdefault(singular(word), []).append(word)
+            grams = char_ngrams(word, ngram_size)
+            self._word_sizes[word] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(word)
+        self._word_postings = {gram: tuple(words) for gram, words in postings.items()}
+
+        # Memoize resolved names and words so repeat lookups skip the scoring pass
+        self._cached_search = lru_cache(maxsize=cache_size)(self._search)
+        self._word_matches = lru_cache(maxsize=cache_size)(self._match_word)
+
+    def _match_word(self, word):
+        """Vocabulary words similar to `word`, as {vocabulary word: similarity}."""
+        key = singular(word)
+        matches = {known: 1.0 for known in self._singular_words.get(key, ())}
+
+        grams = char_ngrams(word, self.ngram_size)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._word_postings.get(gram, ()))
+        for known, overlap in shared.items():
+            similarity = 2.0 * overlap / (len(grams) + self._word_sizes[known])
+            if similarity >= WORD_MIN_SIMILARITY and similarity > matches.get(known, 0.0):
+                matches[known] = similarity
+
+        # Only words the dataset does not know can be abbreviations ("pea" is not "peanut")
+        if key not in self._singular_words:
+            for known in self._word_postings.get(f" {word[:2]}", ()):
+                if _is_abbreviation(word, known) and matches.get(known, 0.0) < ABBREVIATION_SIMILARITY:
+                    matches[known] = ABBREVIATION_SIMILARITY
+        return matches
+
+    def _search(self, query, limit, min_score):
+        words = content_words(query)
+        if not words:
+            return ()
+
+        weights = [1.0] * (len(words) - 1) + [HEAD_WORD_WEIGHT]
+        coverage = {}       # entry ID -> [best similarity per query word]
+        word_scores = {}    # vocabulary word -> best similarity to any query word
+        for index, word in enumerate(words):
+            for known, similarity in self._word_matches(word).items():
+                if similarity > word_scores.get(known, 0.0):
+                    word_scores[known] = similarity
+                for entry_id in self._word_entries[known]:
+                    best = coverage.setdefault(entry_id, [0.0] * len(words))
+                    if similarity > best[index]:
+                        best[index] = similarity
+
+        total_weight = sum(weights)
+        scored = []
+        for entry_id, best in coverage.items():
+            score = sum(weight * similarity for weight, similarity in zip(weights, best)) / total_weight
+            name_parts = self._name_parts.get(entry_id)
+            if name_parts:
+                mentioned = [part for part in name_parts if any(word in word_scores for word in part)]
+                if not mentioned:
+                    score *= KEYWORD_ONLY_FACTOR
+                extra = min(sum(1.0 - word_scores.get(word, 0.0) for word in part) for part in mentioned or name_parts)
+                score *= max(MIN_NAME_FACTOR, 1.0 - EXTRA_WORD_PENALTY * extra)
+            if score >= min_score:
+                scored.append((entry_id, round(score, 4)))
+
+        scored.sort(key=lambda match: match[1], reverse=True)
+        return tuple(scored[:limit])
+
+    def search(self, text, limit=5, min_score=0.5):
+        """
+        Return up to `limit` (entry_id, score) pairs ranked by score, best first.
+        """
+        return self._cached_search(normalize_text(text), limit, min_score)
+
+    def best_match(self, text, min_score=0.8, margin=0.05):
+        """
+        Return the entry ID of a confident match, or None.
+        A match is confident when it clears `min_score` and beats the runner-up by `margin`.
+        """
+        # The runner-up may score just below min_score and still make the match ambiguous
+        matches = self.search(text, limit=2, min_score=min_score - margin)
+        if not matches or matches[0][1] < min_score:
+            return None
+        if len(matches) > 1 and matches[0][1] - matches[1][1] < margin:
+            return None
+        return matches[0][0]
+
+    def cache_info(self):
+        return self._cached_search.cache_info()
@@ -0,0 +1,101 @@
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from services import metrics
+
+# Outbound HTTP tuning, overridable from the environment
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05'))   # Seconds to establish a connection
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '10'))           # Seconds to wait between response bytes
+HTTP_POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', '10'))                 # Hosts with a kept-alive connection pool
+HTTP_POOL_PER_HOST = int(os.getenv('HTTP_POOL_PER_HOST', '10'))           # Concurrent connections per host
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))                # Retries for idempotent requests
+HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', '0.3'))      # Backoff cap grows as factor * 2^retry seconds
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+# Transient upstream answers worth retrying
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class JitteredRetry(Retry):
+    """
+    urllib3 Retry with "full jitter" backoff: each wait is drawn uniformly
+    from [0, exponential backoff], so workers that failed together do not
+    retry in lockstep. Retry-After headers from the server still take precedence.
+    """
+
+    def get_backoff_time(self):
+        return random.uniform(0, super().get_backoff_time())
+
+
+class TimeoutSession(requests.Session):
+    """
+    requests.Session that applies DEFAULT_TIMEOUT to every call made without an
+    explicit timeout and records each call's latency (retries included) per service.
+    """
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+        service = metrics.outbound_service(urlsplit(url).hostname)
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            metrics.outbound_errors.inc(service)
+            metrics.outbound_latency.observe(time.perf_counter() - start, service, 'error')
+            raise
+        metrics.outbound_latency.observe(time.perf_counter() - start, service, response.status_code)
+        return response
+
+
+def create_session():
+    """
+    Build a session with keep-alive pools per host, connect/read timeouts and
+    bounded, jittered retries. Only idempotent methods (GET, HEAD, OPTIONS) are
+    retried; POSTs such as OpenAI completions are sent once.
+    """
+    retry = JitteredRetry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    # pool_block makes HTTP_POOL_PER_HOST a hard limit: extra callers wait for a free connection
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_HOSTS,
+        pool_maxsize=HTTP_POOL_PER_HOST,
+        max_retries=retry,
+        pool_block=True
+    )
+    session = TimeoutSession()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+_session_pid = os.getpid()
+
+
+def get_session():
+    """
+    Return the process-wide shared session, creating it on first use.
+    A forked worker never reuses its parent's kept-alive sockets: the first call
+    after fork builds a fresh session for the new process.
+    """
+    global _session, _session_lock, _session_pid
+    if _session_pid != os.getpid():
+        _session, _session_lock, _session_pid = None, threading.Lock(), os.getpid()
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
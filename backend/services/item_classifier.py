@@ -0,0 +1,234 @@
+import threading
+from functools import lru_cache
+from services.foodkeeper import load_records
+from services.fuzzy_matcher import (
+    EXTRA_WORD_PENALTY, KEYWORD_ONLY_FACTOR, MIN_NAME_FACTOR,
+    FuzzyMatcher, char_ngrams, content_words, normalize_text, singular
+)
+
+# FoodKeeper Category_ID -> GrocerU category (see CATEGORIES in routes/openai.py)
+CATEGORY_MAP = {
+    1: "Pantry Staples",                 # Baby food
+    2: "Pantry Staples",                 # Baked goods
+    3: "Pantry Staples",                 # Baking and cooking
+    4: "Pantry Staples",                 # Refrigerated dough
+    5: "Snacks and Beverages",           # Beverages
+    6: "Pantry Staples",                 # Condiments, sauces and canned goods
+    7: "Dairy",                          # Dairy products and eggs
+    8: "Frozen Foods",                   # Food purchased frozen
+    9: "Pantry Staples",                 # Grains, beans and pasta
+    10: "Meat and Seafood",              # Meat (10-17: fresh, cured, poultry, shelf-stable...)
+    11: "Meat and Seafood",
+    12: "Meat and Seafood",
+    13: "Meat and Seafood",
+    14: "Meat and Seafood",
+    15: "Meat and Seafood",
+    16: "Meat and Seafood",
+    17: "Meat and Seafood",
+    18: "Fresh Produce",                 # Fruit
+    19: "Fresh Produce",                 # Vegetables
+    20: "Meat and Seafood",              # Seafood (20-22: fresh, shellfish, smoked...)
+    21: "Meat and Seafood",
+    22: "Meat and Seafood",
+    23: "Pantry Staples",                # Shelf stable foods
+    24: "Fresh Produce",                 # Soy products such as tofu, sold with produce
+    25: "Household and Miscellaneous",   # Deli and prepared foods, leftovers
+}
+
+FROZEN_CATEGORY_ID = 8
+
+# An item named "frozen ..." is a frozen food whatever its base ingredient
+FROZEN_WORD = "frozen"
+
+# Storage columns that make a row suitable for a location, checked in this order.
+# Unopened storage decides first; after-opening/thawing only breaks ties for the fridge.
+LOCATION_METRICS = (
+    ("Pantry", ("DOP_Pantry_Metric", "Pantry_Metric")),
+    ("Fridge", ("DOP_Refrigerate_Metric", "Refrigerate_Metric",
+                "Refrigerate_After_Opening_Metric", "Refrigerate_After_Thawing_Metric")),
+    ("Freezer", ("DOP_Freeze_Metric", "Freeze_Metric")),
+)
+
+# Metrics that do not make a location suitable for keeping an item
+UNSUITABLE_METRICS = {"not recommended", "hours"}
+
+# Confidence assigned to each kind of match
+EXACT_NAME_CONFIDENCE = 1.0
+EXACT_KEYWORD_CONFIDENCE = 0.9
+AMBIGUOUS_PENALTY = 0.1      # Subtracted when candidates for the same name disagree
+HEAD_NOUN_FACTOR = 0.9       # Multiplier for matches on the trailing words only ("whole milk" -> "milk")
+FUZZY_MIN_SCORE = 0.5
+NAME_SIMILARITY_MIN = 0.5    # Name similarity that decides between rows sharing a key
+FUZZY_MARGIN = 0.05
+
+
+def storage_location(record):
+    """Derive the GrocerU location (Pantry, Fridge, Freezer or Misc.) from a row's storage columns."""
+    if record.Category_ID == FROZEN_CATEGORY_ID:
+        return "Freezer"
+    for location, metrics in LOCATION_METRICS:
+        for metric in metrics:
+            value = getattr(record, metric)
+            if value and value.strip().lower() not in UNSUITABLE_METRICS:
+                return location
+    return "Misc."
+
+
+class ItemClassifier:
+    """
+    Offline category/location classifier over the FoodKeeper dataset.
+
+    Each row is labelled once at load: Category_ID maps to a GrocerU category
+    and the storage columns give a location. Item names are resolved to rows
+    by exact name, then exact keyword, then the item's trailing words (the head
+    noun of "organic whole milk" is "milk"), then fuzzy n-gram matching.
+    When a key matches several rows, a row named the key or its singular/plural
+    wins ("avocado" -> Avocados rather than Avocado Oil), then the row whose name
+    adds the fewest words to the item name, then the closest resemblance and the
+    most specific row, i.e. the one with the fewest keywords.
+    Keyword hits lose confidence for every name word the item name does not
+    mention, and more when it mentions none ("salmon" is a keyword of Fatty fish),
+    with the same factors as the fuzzy matcher.
+    Every answer carries a confidence in [0, 1] so callers can decide when to
+    fall back to a remote model.
+    """
+
+    def __init__(self, records, cache_size=4096):
+        self._labels = {}
+        self._name_grams = {}
+        self._name_parts = {}
+        self._keyword_counts = {}
+        name_index = {}
+        keyword_index = {}
+        entries = {}
+
+        for record in records:
+            category = CATEGORY_MAP.get(record.Category_ID)
+            if category is None:
+                continue
+            position = record.position
+            self._labels[position] = (category, storage_location(record), record.Name)
+            self._name_grams[position] = char_ngrams(normalize_text(record.Name))
+            # "Ketchup, cocktail, or chili sauce" is also named "ketchup" through its first part
+            parts = [normalize_text(record.Name)] + [normalize_text(part) for part in record.Name.split(',')]
+            self._name_parts[position] = tuple(
+                frozenset(singular(word) for word in content_words(part)) for part in dict.fromkeys(parts) if part
+            )
+
+            name_index.setdefault(normalize_text(record.Name), []).append(position)
+            texts = [record.Name]
+            if record.Name_subtitle:
+                texts.append(f"{record.Name} {record.Name_subtitle}")
+            keywords = [keyword for keyword in map(normalize_text, (record.Keywords or '').split(',')) if keyword]
+            for keyword in keywords:
+                keyword_index.setdefault(keyword, []).append(position)
+            self._keyword_counts[position] = len(keywords)
+            entries[position] = texts + keywords
+
+        # Dataset order is kept: FoodKeeper lists the generic entry for a name first
+        self._name_index = {key: tuple(positions) for key, positions in name_index.items()}
+        self._keyword_index = {key: tuple(positions) for key, positions in keyword_index.items()}
+        self._matcher = FuzzyMatcher(entries, cache_size=cache_size)
+        self._cached_classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _answer(self, position, confidence, frozen=False):
+        category, location, match = self._labels[position]
+        if frozen:
+            category, location = CATEGORY_MAP[FROZEN_CATEGORY_ID], "Freezer"
+        return {
+            "category": category,
+            "location": location,
+            "confidence": round(max(0.0, min(confidence, 1.0)), 4),
+            "match": match
+        }
+
+    def _name_fit(self, position, query_words):
+        """
+        (named, mentioned, extra) for a row: whether a name part is exactly the query's
+        words, whether the query mentions any name word, and the fewest name words
+        the query leaves out.
+        """
+        mentioned = [part for part in self._name_parts[position] if part & query_words]
+        if not mentioned:
+            return False, False, min(len(part) for part in self._name_parts[position])
+        extra = min(len(part - query_words) for part in mentioned)
+        return any(part == query_words for part in mentioned), True, extra
+
+    def _closest(self, positions, query_words, query_grams):
+        # Named the key first, then fewest added words, then close resemblance and
+        # fewest keywords; remaining ties keep dataset order
+        def rank(position):
+            named, mentioned, extra = self._name_fit(position, query_words)
+            name_grams = self._name_grams[position]
+            total = len(query_grams) + len(name_grams)
+            similarity = 2.0 * len(query_grams & name_grams) / total if total else 0.0
+            return (named, mentioned, -extra, similarity if similarity >= NAME_SIMILARITY_MIN else 0.0,
+                    -self._keyword_counts[position])
+        return max(positions, key=rank)
+
+    def _exact(self, key, query_words, query_grams):
+        for index, confidence in ((self._name_index, EXACT_NAME_CONFIDENCE),
+                                  (self._keyword_index, EXACT_KEYWORD_CONFIDENCE)):
+            positions = index.get(key)
+            if positions:
+                best = self._closest(positions, query_words, query_grams) if len(positions) > 1 else positions[0]
+                label = self._labels[best][:2]
+                if any(self._labels[position][:2] != label for position in positions):
+                    confidence -= AMBIGUOUS_PENALTY
+                _, mentioned, extra = self._name_fit(best, query_words)
+                if not mentioned:
+                    confidence *= KEYWORD_ONLY_FACTOR
+                confidence *= max(MIN_NAME_FACTOR, 1.0 - EXTRA_WORD_PENALTY * extra)
+                return best, confidence
+        return None
+
+    def _classify(self, text):
+        if not text:
+            return None
+        words = text.split()
+        frozen = FROZEN_WORD in words
+        query_words = frozenset(singular(word) for word in content_words(text))
+        query_grams = char_ngrams(text)
+
+        exact = self._exact(text, query_words, query_grams)
+        if exact:
+            return self._answer(*exact, frozen=frozen)
+
+        # Drop leading modifiers one word at a time and retry the exact indexes
+        for start in range(1, len(words)):
+            exact = self._exact(' '.join(words[start:]), query_words, query_grams)
+            if exact:
+                return self._answer(exact[0], exact[1] * HEAD_NOUN_FACTOR, frozen=frozen)
+
+        matches = self._matcher.search(text, limit=2, min_score=FUZZY_MIN_SCORE)
+        if not matches:
+            return None
+        (position, score), runner_up = matches[0], matches[1] if len(matches) > 1 else None
+        if (runner_up and score - runner_up[1] < FUZZY_MARGIN
+                and self._labels[runner_up[0]][:2] != self._labels[position][:2]):
+            score -= AMBIGUOUS_PENALTY
+        return self._answer(position, score, frozen=frozen)
+
+    def classify(self, item_name):
+        """
+        Return {"category", "location", "confidence", "match"} for an item name,
+        or None when nothing in the dataset resembles it.
+        """
+        return self._cached_classify(normalize_text(item_name))
+
+    def cache_info(self):
+        return self._cached_classify.cache_info()
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_classifier():
+    """Return the process-wide classifier over the FoodKeeper dataset, building it on first use."""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = ItemClassifier(load_records())
+    return _classifier
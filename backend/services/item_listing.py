@@ -0,0 +1,163 @@
+import base64
+import json
+
+# Columns a client may project with `fields=`
+ITEM_COLUMNS = (
+    'item_id', 'item_name', 'category', 'quantity', 'user_id', 'is_checked',
+    'item_state', 'location', 'in_list', 'created_at', 'stored_at'
+)
+
+# Sort keys and the SQL expression used for ordering and keyset comparisons.
+# Nullable columns are coalesced so the (sort value, item_id) key is always comparable.
+SORT_EXPRESSIONS = {
+    'item_id': 'item_id',
+    'item_name': 'item_name',
+    'category': 'category',
+    'quantity': 'quantity',
+    'location': 'location',
+    'item_state': "COALESCE(item_state, '')",
+    'created_at': "COALESCE(created_at, '')",
+    'stored_at': "COALESCE(stored_at, '')",
+}
+
+# Exact-match filters accepted as query parameters
+FILTER_COLUMNS = ('category', 'location', 'item_state')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class ListingError(ValueError):
+    """Raised for invalid listing parameters; the message is safe to return to the client."""
+
+
+def encode_cursor(sort, order, sort_value, item_id):
+    raw = json.dumps([sort, order, sort_value, item_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor, sort, order):
+    """
+    Return the (sort value, item_id) position stored in `cursor`. A cursor only
+    continues the listing it came from, so its sort and order must match the request's.
+    """
+    try:
+        cursor_sort, cursor_order, sort_value, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise ListingError("Invalid cursor.")
+    # Both values are bound as SQL parameters, so only the scalars build_page encodes are accepted
+    if (isinstance(sort_value, bool) or not isinstance(sort_value, (str, int, float))
+            or isinstance(item_id, bool) or not isinstance(item_id, int)):
+        raise ListingError("Invalid cursor.")
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise ListingError(
+            f"The cursor belongs to a listing sorted by '{cursor_sort}' {cursor_order}; "
+            f"request the next page with the same sort and order."
+        )
+    return sort_value, item_id
+
+
+def parse_listing_args(args):
+    """
+    Parse listing query parameters into a spec dict.
+
+    Supported parameters: fields, sort, order (asc|desc), limit, cursor,
+    category, location, item_state and q (item name prefix).
+    Pagination is only enabled when `limit` or `cursor` is given.
+    """
+    fields = args.get('fields')
+    if fields:
+        columns = [column.strip() for column in fields.split(',') if column.strip()]
+        unknown = [column for column in columns if column not in ITEM_COLUMNS]
+        if unknown:
+            raise ListingError(f"Unknown field(s): {', '.join(unknown)}.")
+        # item_id identifies rows and anchors the cursor, so it is always returned
+        columns = ['item_id'] + [column for column in dict.fromkeys(columns) if column != 'item_id']
+    else:
+        columns = list(ITEM_COLUMNS)
+
+    sort = args.get('sort', 'item_id')
+    if sort not in SORT_EXPRESSIONS:
+        raise ListingError(f"Invalid sort: '{sort}'. Use one of: {', '.join(SORT_EXPRESSIONS)}.")
+
+    order = args.get('order', 'asc').lower()
+    if order not in ('asc', 'desc'):
+        raise ListingError("Invalid order: use 'asc' or 'desc'.")
+
+    paginate = 'limit' in args or 'cursor' in args
+    limit = None
+    if paginate:
+        try:
+            limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            raise ListingError("'limit' must be an integer.")
+        if limit < 1:
+            raise ListingError("'limit' must be positive.")
+        limit = min(limit, MAX_PAGE_SIZE)
+
+    cursor = decode_cursor(args['cursor'], sort, order) if args.get('cursor') else None
+
+    return {
+        'columns': columns,
+        'sort': sort,
+        'order': order,
+        'paginate': paginate,
+        'limit': limit,
+        'cursor': cursor,
+        'filters': {column: args[column] for column in FILTER_COLUMNS if args.get(column)},
+        'name_prefix': args.get('q') or None,
+    }
+
+
+def build_item_query(user_id, in_list, spec):
+    """
+    Build the SELECT for one page of a user's items.
+    `in_list` is 0 (inventory), 1 (grocery list) or None (all items).
+    Returns (sql, params). When paginating, one extra row is fetched to detect a next page.
+    """
+    sort_expression = SORT_EXPRESSIONS[spec['sort']]
+    columns = list(spec['columns'])
+    select_columns = columns + ([f'{sort_expression} AS _sort_key'] if spec['paginate'] else [])
+
+    conditions = ['user_id = ?']
+    params = [user_id]
+
+    if in_list is not None:
+        conditions.append('in_list = ?')
+        params.append(in_list)
+
+    for column, value in spec['filters'].items():
+        conditions.append(f'{column} = ?')
+        params.append(value)
+
+    if spec['name_prefix']:
+        escaped = spec['name_prefix'].replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        conditions.append("item_name LIKE ? ESCAPE '\\'")
+        params.append(escaped + '%')
+
+    comparison = '>' if spec['order'] == 'asc' else '<'
+    if spec['cursor'] is not None:
+        conditions.append(f'({sort_expression}, item_id) {comparison} (?, ?)')
+        params.extend(spec['cursor'])
+
+    direction = spec['order'].upper()
+    sql = (
+        f"SELECT {', '.join(select_columns)} FROM Items WHERE {' AND '.join(conditions)} "
+        f"ORDER BY {sort_expression} {direction}, item_id {direction}"
+    )
+    if spec['paginate']:
+        sql += ' LIMIT ?'
+        params.append(spec['limit'] + 1)
+
+    return sql, params
+
+
+def build_page(rows, spec):
+    """Split fetched rows into (items, next_cursor) for a paginated listing."""
+    has_more = len(rows) > spec['limit']
+    rows = rows[:spec['limit']]
+    items = [{column: row[column] for column in spec['columns']} for row in rows]
+    next_cursor = (
+        encode_cursor(spec['sort'], spec['order'], rows[-1]['_sort_key'], rows[-1]['item_id']) if has_more else None
+    )
+    return items, next_cursor
@@ -0,0 +1,325 @@
+import glob
+import json
+import os
+import threading
+import time
+from flask import g, request
+
+# Directory shared by the worker processes of one server (set by gunicorn.conf.py).
+# Each process writes its series there and /metrics merges them, so a scrape that
+# lands on any worker reports the whole server. Unset or empty: metrics cover this process only.
+METRICS_DIR = os.getenv('METRICS_DIR') or None
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '1'))   # Seconds between a worker's snapshots
+
+# Histogram bucket upper bounds in seconds, shared by request, query and outbound timings
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Outbound hosts reported under a service name instead of the hostname
+OUTBOUND_SERVICES = {
+    'api.edamam.com': 'edamam',
+    'api.openai.com': 'openai'
+}
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return tuple(str(label) for label in labels)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.extend(self._samples(labels, value))
+        return lines
+
+    def _samples(self, labels, value):
+        return [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}']
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+    def _merge_value(self, total, value):
+        return value if total is None else total + value
+
+    def render_merged(self, snapshots):
+        """Render the sum of several processes' snapshots of this metric."""
+        merged = {}
+        for snapshot in snapshots:
+            for labels, value in snapshot:
+                key = tuple(labels)
+                merged[key] = self._merge_value(merged.get(key), value)
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for labels, value in sorted(merged.items()):
+            lines.extend(self._samples(labels, value))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. requests served."""
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. requests in flight."""
+    kind = 'gauge'
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram in the Prometheus layout, so quantiles such as
+    p50/p99 can be computed server-side with histogram_quantile().
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, *labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), [list(state[0]), state[1], state[2]]] for labels, state in self._values.items()]
+
+    def _merge_value(self, total, value):
+        if total is None:
+            return [list(value[0]), value[1], value[2]]
+        return [[a + b for a, b in zip(total[0], value[0])], total[1] + value[1], total[2] + value[2]]
+
+    def _samples(self, labels, value):
+        counts, total, count = value
+        samples = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            label_text = _format_labels(self.labelnames, labels, [('le', _format_value(bound))])
+            samples.append(f'{self.name}_bucket{label_text} {cumulative}')
+        label_text = _format_labels(self.labelnames, labels)
+        samples.append(f'{self.name}_sum{label_text} {_format_value(total)}')
+        samples.append(f'{self.name}_count{label_text} {count}')
+        return samples
+
+
+http_requests = Counter(
+    'grocer_http_requests_total', 'HTTP requests served.', ('method', 'endpoint', 'status')
+)
+http_errors = Counter(
+    'grocer_http_request_errors_total', 'HTTP requests that ended in a 5xx response.', ('method', 'endpoint')
+)
+http_latency = Histogram(
+    'grocer_http_request_duration_seconds', 'Time spent handling HTTP requests.', ('method', 'endpoint')
+)
+http_in_flight = Gauge(
+    'grocer_http_requests_in_flight', 'HTTP requests currently being handled.', ('endpoint',)
+)
+db_latency = Histogram(
+    'grocer_db_query_duration_seconds', 'Time spent executing SQLite statements.', ('operation',)
+)
+db_errors = Counter(
+    'grocer_db_query_errors_total', 'SQLite statements that raised an error.', ('operation',)
+)
+outbound_latency = Histogram(
+    'grocer_outbound_request_duration_seconds', 'Time spent on outbound HTTP calls, including retries.',
+    ('service', 'status')
+)
+outbound_errors = Counter(
+    'grocer_outbound_request_errors_total', 'Outbound HTTP calls that failed without a response.', ('service',)
+)
+
+
+def sql_operation(sql):
+    """Low-cardinality label for a statement: its leading keyword (SELECT, INSERT, BEGIN...)."""
+    words = sql.split(None, 1)
+    return words[0].upper() if words else 'EMPTY'
+
+
+def outbound_service(hostname):
+    return OUTBOUND_SERVICES.get(hostname, hostname or 'unknown')
+
+
+_flush_pid = None
+_flush_lock = threading.Lock()
+_import_pid = os.getpid()
+
+
+def _snapshot_path(pid):
+    return os.path.join(METRICS_DIR, f'metrics_{pid}.json')
+
+
+def flush():
+    """Write this process's series to METRICS_DIR, replacing its previous snapshot atomically."""
+    if not METRICS_DIR:
+        return
+    snapshot = {metric.name: metric.snapshot() for metric in _registry}
+    path = _snapshot_path(os.getpid())
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as snapshot_file:
+        json.dump(snapshot, snapshot_file)
+    os.replace(temporary, path)
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        try:
+            flush()
+        except OSError:
+            pass
+
+
+def _start_flusher():
+    # One flusher thread per process, started lazily so each forked worker gets its own
+    global _flush_pid
+    if not METRICS_DIR or _flush_pid == os.getpid():
+        return
+    with _flush_lock:
+        if _flush_pid != os.getpid():
+            if os.getpid() != _import_pid:
+                # A forked worker must not report series the parent recorded before the fork
+                for metric in _registry:
+                    with metric._lock:
+                        metric._values.clear()
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            threading.Thread(target=_flush_periodically, daemon=True, name='metrics-flush').start()
+            _flush_pid = os.getpid()
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_snapshots():
+    """Snapshots of every worker: counters and histograms of exited workers are kept, their gauges dropped."""
+    flush()
+    snapshots = []
+    for path in glob.glob(os.path.join(METRICS_DIR, 'metrics_*.json')):
+        try:
+            pid = int(os.path.basename(path)[len('metrics_'):-len('.json')])
+            with open(path) as snapshot_file:
+                snapshots.append((pid, json.load(snapshot_file)))
+        except (OSError, ValueError):
+            continue
+    return [(pid == os.getpid() or _process_alive(pid), snapshot) for pid, snapshot in snapshots]
+
+
+def render():
+    """All registered metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    if METRICS_DIR:
+        snapshots = _read_snapshots()
+        for metric in _registry:
+            lines.extend(metric.render_merged(
+                snapshot.get(metric.name, []) for alive, snapshot in snapshots
+                if alive or metric.kind != 'gauge'
+            ))
+    else:
+        for metric in _registry:
+            lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def clear_snapshots():
+    """Remove every worker snapshot, e.g. when a server starts, so counters start from zero."""
+    if METRICS_DIR:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        for path in glob.glob(os.path.join(METRICS_DIR, 'metrics_*.json*')):
+            os.remove(path)
+
+
+def _endpoint():
+    # The route pattern, not the path, so '/recipe_items/<string:title>' is one series
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def _before_request():
+    _start_flusher()
+    g._metrics = (time.perf_counter(), _endpoint())
+    http_in_flight.inc(g._metrics[1])
+
+
+def _after_request(response):
+    started = g.get('_metrics')
+    if started is not None:
+        start, endpoint = started
+        http_latency.observe(time.perf_counter() - start, request.method, endpoint)
+        http_requests.inc(request.method, endpoint, response.status_code)
+        if response.status_code >= 500:
+            http_errors.inc(request.method, endpoint)
+    return response
+
+
+def _teardown_request(exception=None):
+    started = g.pop('_metrics', None)
+    if started is not None:
+        http_in_flight.dec(started[1])
+
+
+def init_app(app):
+    """
+    Time every request of `app` and count it by route and status.
+    With METRICS_DIR set, /metrics reports the sum over every worker process.
+    """
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,143 @@
+from functools import lru_cache
+import numpy as np
+from utils.ingredient_parser import DESCRIPTORS, NAME_MODIFIERS, clean_ingredient
+
+# Irregular plurals the suffix rules below would get wrong
+IRREGULAR_SINGULARS = {
+    'leaves': 'leaf', 'loaves': 'loaf', 'halves': 'half', 'knives': 'knife',
+    'potatoes': 'potato', 'tomatoes': 'tomato', 'mangoes': 'mango', 'cloves': 'clove',
+    'anchovies': 'anchovy', 'radishes': 'radish', 'dishes': 'dish', 'peaches': 'peach',
+    'molasses': 'molasses', 'hummus': 'hummus', 'couscous': 'couscous', 'asparagus': 'asparagus',
+    'swiss': 'swiss', 'grass': 'grass', 'watercress': 'watercress', 'bass': 'bass'
+}
+
+
+def _singular(word):
+    if word in IRREGULAR_SINGULARS:
+        return IRREGULAR_SINGULARS[word]
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 4 and word.endswith(('ches', 'shes', 'sses', 'xes', 'zes')):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=16384)
+def ingredient_key(text):
+    """
+    Normalize an ingredient line or item name for matching: quantities, units and
+    descriptors are stripped by the ingredient parser and every word is singularized,
+    so '3 large eggs, beaten' and the inventory item 'Eggs' share the key 'egg'.
+    """
+    name = clean_ingredient(text)
+    return ' '.join(_singular(word) for word in name.split())
+
+
+# Leading words an inventory item may leave out and still cover an ingredient: the
+# parser's descriptors and name modifiers, plus grades of the same product
+_COVERING_MODIFIERS = frozenset(
+    _singular(word) for word in DESCRIPTORS + NAME_MODIFIERS + ('all-purpose', 'granulated', 'unbleached', 'plain')
+)
+
+
+def covering_keys(key):
+    # An ingredient is covered by its own key, or by its trailing words when every word
+    # left out is a modifier: inventory 'milk' covers 'whole milk' and 'flour' covers
+    # 'all-purpose flour', but 'butter' does not cover 'peanut butter' nor 'cream' 'sour cream'
+    words = key.split()
+    keys = [key]
+    for start in range(1, len(words)):
+        if words[start - 1] not in _COVERING_MODIFIERS:
+            break
+        keys.append(' '.join(words[start:]))
+    return keys
+
+
+class RecipeCoverageIndex:
+    """
+    Inverted index from normalized ingredient to the recipes that use it.
+
+    The recipe x ingredient incidence is kept as two parallel index arrays (a
+    sparse COO matrix), so scoring every recipe against an inventory is a single
+    pass: mark the ingredient columns the inventory covers, then count covered and
+    total ingredients per recipe with np.bincount.
+    """
+
+    def __init__(self, recipes):
+        """`recipes` maps a recipe title to its ingredient lines (raw or already cleaned)."""
+        self.titles = list(recipes)
+        self.keys = []
+        self.names = []
+        self.postings = {}   # ingredient key -> list of recipe rows
+        columns = {}
+        rows, cols = [], []
+
+        for row, title in enumerate(self.titles):
+            seen = set()
+            for line in recipes[title]:
+                key = ingredient_key(line)
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                col = columns.get(key)
+                if col is None:
+                    col = columns[key] = len(self.keys)
+                    self.keys.append(key)
+                    self.names.append(clean_ingredient(line))
+                    self.postings[key] = []
+                self.postings[key].append(row)
+                rows.append(row)
+                cols.append(col)
+
+        self._rows = np.asarray(rows, dtype=np.int64)
+        self._cols = np.asarray(cols, dtype=np.int64)
+        self._totals = np.bincount(self._rows, minlength=len(self.titles))
+
+    def recipes_using(self, ingredient):
+        """Titles of the recipes that use `ingredient`."""
+        return [self.titles[row] for row in self.postings.get(ingredient_key(ingredient), ())]
+
+    def covered_columns(self, inventory_names):
+        inventory = {key for key in map(ingredient_key, inventory_names) if key}
+        return np.fromiter(
+            (any(candidate in inventory for candidate in covering_keys(key)) for key in self.keys),
+            dtype=bool, count=len(self.keys)
+        )
+
+    def score(self, inventory_names, limit=None):
+        """
+        Rank every recipe by the share of its ingredients the inventory covers,
+        then by fewest missing ingredients. Returns a list of dicts with coverage,
+        counts and the missing ingredient names.
+        """
+        if not self.titles:
+            return []
+
+        covered = self.covered_columns(inventory_names)
+        hits = covered[self._cols]
+        matched = np.bincount(self._rows[hits], minlength=len(self.titles))
+        missing = self._totals - matched
+        coverage = np.divide(matched, self._totals, out=np.zeros(len(self.titles)), where=self._totals > 0)
+
+        # lexsort sorts by the last key first: coverage desc, then missing asc, then title order
+        order = np.lexsort((np.arange(len(self.titles)), missing, -coverage))
+        if limit is not None:
+            order = order[:limit]
+
+        missing_by_row = {}
+        for row, col in zip(self._rows[~hits].tolist(), self._cols[~hits].tolist()):
+            missing_by_row.setdefault(row, []).append(self.names[col])
+
+        return [
+            {
+                "title": self.titles[row],
+                "coverage": round(float(coverage[row]), 4),
+                "ingredient_count": int(self._totals[row]),
+                "matched_count": int(matched[row]),
+                "missing_count": int(missing[row]),
+                "missing": missing_by_row.get(row, [])
+            }
+            for row in order.tolist()
+        ]
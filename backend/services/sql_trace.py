@@ -0,0 +1,130 @@
+import logging
+import os
+import sqlite3
+import threading
+from flask import g, has_app_context, request
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Opt-in SQL tracing, configurable from the environment
+SQL_TRACE = os.getenv('SQL_TRACE', 'False') == 'True'               # Record every statement run by a request
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '100'))             # Log statements slower than this with their plan; 0 disables
+SQL_REPEAT_WARN = int(os.getenv('SQL_REPEAT_WARN', '10'))            # Flag a request running one statement this often (N+1)
+
+# Statements worth asking SQLite for a query plan
+PLANNED_OPERATIONS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')
+
+_local = threading.local()
+
+
+def _request_log():
+    return g.get('_sql_trace') if has_app_context() else None
+
+
+def trace_statement(statement):
+    """
+    sqlite3 trace callback (see Connection.set_trace_callback). SQLite reports every
+    statement it runs with the bound values expanded, including the implicit BEGIN
+    the sqlite3 module issues.
+    """
+    statement = ' '.join(statement.split())
+    pending = getattr(_local, 'pending', None)
+    if pending is not None:
+        # Each trigger program a statement fires reports the statement again
+        if not pending or pending[-1] != statement:
+            pending.append(statement)
+        return
+    # Not part of a timed cursor call, e.g. conn.commit()
+    log = _request_log()
+    if log is not None:
+        log.append({"sql": statement, "ms": None, "statements": [statement]})
+
+
+def start_statement():
+    _local.pending = []
+
+
+def finish_statement(conn, sql, parameters, duration):
+    """
+    Record a timed cursor call in the current request's trace (when SQL_TRACE is on)
+    and send it to the slow-query log when it took SLOW_QUERY_MS or longer.
+    `parameters` is None for executemany/executescript, which are logged without a plan.
+    """
+    statements, _local.pending = getattr(_local, 'pending', None) or [], None
+    ms = duration * 1000
+    log = _request_log()
+    if log is not None:
+        log.append({"sql": ' '.join(sql.split()), "ms": round(ms, 3), "statements": statements})
+    if SLOW_QUERY_MS > 0 and ms >= SLOW_QUERY_MS:
+        log_slow_query(conn, sql, parameters, ms)
+
+
+def query_plan(conn, sql, parameters):
+    """EXPLAIN QUERY PLAN rows for `sql` as indented lines, or [] when SQLite cannot plan it."""
+    # Keep the EXPLAIN itself out of the request's trace
+    _local.pending = []
+    try:
+        rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', parameters).fetchall()
+    except sqlite3.Error:
+        return []
+    finally:
+        _local.pending = None
+    depth = {0: 0}
+    lines = []
+    for node_id, parent_id, _, detail in rows:
+        depth[node_id] = depth.get(parent_id, 0) + 1
+        lines.append('  ' * depth[node_id] + detail)
+    return lines
+
+
+def log_slow_query(conn, sql, parameters, ms):
+    plan = []
+    if parameters is not None and sql.lstrip().split(None, 1)[0].upper() in PLANNED_OPERATIONS:
+        plan = query_plan(conn, sql, parameters)
+    where = f" during {g.get('_sql_trace_route')}" if has_app_context() and g.get('_sql_trace_route') else ''
+    logger.warning(
+        "Slow query (%.1f ms)%s: %s\nQUERY PLAN\n%s",
+        ms, where, ' '.join(sql.split()), '\n'.join(plan) or '  (no plan)'
+    )
+
+
+def request_summary(log):
+    """Statement count, total time and the statements repeated SQL_REPEAT_WARN times or more."""
+    counts = {}
+    for entry in log:
+        if entry["ms"] is not None:
+            counts[entry["sql"]] = counts.get(entry["sql"], 0) + 1
+    return {
+        "queries": sum(counts.values()),
+        "ms": round(sum(entry["ms"] for entry in log if entry["ms"] is not None), 3),
+        "repeated": {sql: count for sql, count in counts.items() if count >= SQL_REPEAT_WARN}
+    }
+
+
+def _before_request():
+    g._sql_trace = []
+    g._sql_trace_route = f"{request.method} {request.path}"
+
+
+def _after_request(response):
+    log = g.pop('_sql_trace', None)
+    if log is None:
+        return response
+    summary = request_summary(log)
+    route = g.get('_sql_trace_route')
+    logger.info("%s ran %d queries in %.1f ms", route, summary["queries"], summary["ms"])
+    for entry in log:
+        logger.debug("  %s ms  %s", entry["ms"], ' | '.join(entry["statements"]) or entry["sql"])
+    for sql, count in summary["repeated"].items():
+        logger.warning("%s ran the same statement %d times (possible N+1): %s", route, count, sql)
+    response.headers['X-SQL-Queries'] = str(summary["queries"])
+    response.headers['X-SQL-Time-Ms'] = str(summary["ms"])
+    return response
+
+
+def init_app(app):
+    """When SQL_TRACE is on, trace each request's statements and log a per-request summary."""
+    if SQL_TRACE:
+        app.before_request(_before_request)
+        app.after_request(_after_request)
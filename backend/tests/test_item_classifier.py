@@ -0,0 +1,37 @@
+import pytest
+from services.item_classifier import get_classifier
+
+# Default CLASSIFIER_MIN_CONFIDENCE in routes/openai.py
+MIN_CONFIDENCE = 0.8
+
+
+@pytest.fixture(scope='module')
+def classifier():
+    return get_classifier()
+
+
+# Keyword or head-noun hits on a row the name does not describe; OpenAI must be asked
+@pytest.mark.parametrize('name', ["chkn breast", "salmon", "steak", "fish sticks", "lemon", "spinach"])
+def test_ambiguous_names_are_not_confident(classifier, name):
+    answer = classifier.classify(name)
+    assert answer is None or answer["confidence"] < MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize('name, match, category', [
+    ("avocado", "Avocados", "Fresh Produce"),
+    ("apple", "Apples", "Fresh Produce"),
+    ("ketchup", "Ketchup, cocktail, or chili sauce", "Pantry Staples"),
+    ("organic whole milk", "Milk", "Dairy"),
+    ("lamb breast", "Lamb", "Meat and Seafood"),
+    ("frozen peas", "Peas", "Frozen Foods"),
+])
+def test_confident_names(classifier, name, match, category):
+    answer = classifier.classify(name)
+    assert answer["match"] == match
+    assert answer["category"] == category
+    assert answer["confidence"] >= MIN_CONFIDENCE
+
+
+def test_unknown_names_are_not_classified(classifier):
+    assert classifier.classify("dish soap") is None
+    assert classifier.classify("paper towels") is None
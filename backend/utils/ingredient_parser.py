@@ -0,0 +1,146 @@
+import re
+from functools import lru_cache
+
+# Unicode vulgar fractions found in recipe lines, rewritten as plain text
+UNICODE_FRACTIONS = {
+    '½': ' 1/2', '⅓': ' 1/3', '⅔': ' 2/3', '¼': ' 1/4', '¾': ' 3/4',
+    '⅕': ' 1/5', '⅖': ' 2/5', '⅗': ' 3/5', '⅘': ' 4/5', '⅙': ' 1/6',
+    '⅚': ' 5/6', '⅛': ' 1/8', '⅜': ' 3/8', '⅝': ' 5/8', '⅞': ' 7/8'
+}
+
+# Words that stand in for a number at the start of a line ("a pinch of", "two eggs")
+QUANTITY_WORDS = (
+    'a', 'an', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight',
+    'nine', 'ten', 'eleven', 'twelve', 'half', 'quarter', 'dozen', 'few', 'several', 'some'
+)
+
+# Units of measure and packaging, singular and plural, with common abbreviations.
+# Units are only stripped right after a quantity, so single letters (g, l, c, t) are safe.
+UNITS = (
+    'cups', 'cup', 'c',
+    'tablespoons', 'tablespoon', 'tbsps', 'tbsp', 'tbs', 'tbl', 'tb',
+    'teaspoons', 'teaspoon', 'tsps', 'tsp', 't',
+    'fluid ounces', 'fluid ounce', 'fl oz', 'fl. oz', 'ounces', 'ounce', 'oz',
+    'pounds', 'pound', 'lbs', 'lb',
+    'kilograms', 'kilogram', 'kgs', 'kg', 'grams', 'gram', 'g',
+    'milliliters', 'milliliter', 'millilitres', 'millilitre', 'ml',
+    'liters', 'liter', 'litres', 'litre', 'l',
+    'pints', 'pint', 'pt', 'quarts', 'quart', 'qt', 'gallons', 'gallon', 'gal',
+    'cloves', 'clove', 'cans', 'can', 'jars', 'jar', 'bottles', 'bottle',
+    'packages', 'package', 'pkgs', 'pkg', 'packets', 'packet', 'boxes', 'box',
+    'bags', 'bag', 'containers', 'container', 'cartons', 'carton',
+    'sticks', 'stick', 'slices', 'slice', 'pieces', 'piece', 'pinches', 'pinch',
+    'dashes', 'dash', 'drops', 'drop', 'handfuls', 'handful', 'bunches', 'bunch',
+    'heads', 'head', 'sprigs', 'sprig', 'stalks', 'stalk', 'leaves', 'sheets', 'sheet',
+    'fillets', 'fillet', 'strips', 'strip', 'cubes', 'cube', 'envelopes', 'envelope'
+)
+
+# Preparation, size and quality words that are not part of the food's name.
+# They are only stripped before or after the name, never from inside it.
+DESCRIPTORS = (
+    'fresh', 'freshly', 'chopped', 'diced', 'minced', 'sliced', 'grated',
+    'shredded', 'crushed', 'crumbled', 'cubed', 'halved', 'quartered', 'julienned',
+    'peeled', 'seeded', 'pitted', 'cored', 'trimmed', 'deveined', 'boneless', 'skinless',
+    'large', 'small', 'medium', 'extra-large', 'jumbo', 'big', 'thin', 'thick',
+    'finely', 'roughly', 'coarsely', 'thinly', 'thickly', 'lightly', 'well', 'freshly',
+    'firmly', 'loosely', 'packed', 'heaping', 'heaped', 'level', 'scant', 'generous',
+    'softened', 'melted', 'beaten', 'whisked', 'sifted', 'toasted', 'roasted', 'cooked',
+    'uncooked', 'raw', 'drained', 'rinsed', 'thawed', 'divided', 'optional', 'about',
+    'approximately', 'plus', 'more', 'extra', 'virgin', 'extra-virgin', 'organic',
+    'good-quality', 'quality', 'store-bought', 'homemade', 'ripe', 'warm',
+    'lukewarm', 'room-temperature', 'low-fat', 'low-sodium', 'reduced-sodium',
+    'fat-free', 'nonfat', 'unsalted', 'kosher', 'dried', 'canned', 'prepared'
+)
+
+# Words that look like descriptors but name a different product, so they are kept:
+# 'hot sauce', 'whole milk', 'cold brew', 'frozen peas', 'ground beef'
+NAME_MODIFIERS = ('hot', 'whole', 'cold', 'frozen', 'ground')
+
+# Ingredients that are never worth tracking in an inventory
+IGNORED_INGREDIENTS = {'water', 'ice', 'ice water', 'boiling water', 'cold water', 'hot water', 'warm water'}
+
+# Mixed numbers first so '2 1/2' is not read as '2'
+_NUMBER = r'(?:\d+\s+\d+\s*/\s*\d+|\d+(?:[.,]\d+)?(?:\s*/\s*\d+)?)'
+_QUANTITY_PATTERN = re.compile(
+    rf'^(?:(?:{_NUMBER})(?:\s*(?:-|–|to)\s*(?:{_NUMBER}))?|(?:{"|".join(QUANTITY_WORDS)})(?=\s))\s*',
+    re.IGNORECASE
+)
+_UNIT_PATTERN = re.compile(
+    r'^(?:' + '|'.join(re.escape(unit) for unit in sorted(UNITS, key=len, reverse=True)) + r')\.?(?=\s|$)\s*(?:of\s+)?',
+    re.IGNORECASE
+)
+_UNIT_SUFFIX_PATTERN = re.compile(r'\.?\s*(?:of\s*)?$', re.IGNORECASE)
+_PARENTHETICAL_PATTERN = re.compile(r'\(.*?\)|\[.*?\]')
+_TRAILING_PATTERN = re.compile(r',|;|\s+-\s+|\s+or\s+|\s+for\s+|\s+to\s+taste|\s+as\s+needed|\s+such\s+as\s+', re.IGNORECASE)
+_DESCRIPTOR = r'(?:' + '|'.join(re.escape(word) for word in sorted(DESCRIPTORS, key=len, reverse=True)) + r')(?![\w-])'
+_LEADING_DESCRIPTORS_PATTERN = re.compile(rf'^(?:{_DESCRIPTOR}(?:\s+and)?\s*)+', re.IGNORECASE)
+_TRAILING_DESCRIPTORS_PATTERN = re.compile(rf'(?:\s+(?:and\s+)?{_DESCRIPTOR})+$', re.IGNORECASE)
+_LEADING_NOISE_PATTERN = re.compile(r'^[\s*•\-–]+')
+_NON_NAME_PATTERN = re.compile(r'[^a-z\s\'-]+')
+_LEADING_OF_PATTERN = re.compile(r'^(?:of|and)\s+')
+
+
+def _replace_unicode_fractions(text):
+    for fraction, replacement in UNICODE_FRACTIONS.items():
+        text = text.replace(fraction, replacement)
+    return text
+
+
+@lru_cache(maxsize=8192)
+def parse_ingredient(line):
+    """
+    Split an ingredient line into (quantity, unit, name).
+
+    '2 1/2 cups all-purpose flour, sifted' -> ('2 1/2', 'cups', 'all-purpose flour').
+    quantity and unit are None when the line has none; name is '' when nothing
+    food-like is left (e.g. 'salt and pepper to taste' keeps 'salt and pepper').
+    """
+    if not isinstance(line, str):
+        return None, None, ''
+
+    text = _replace_unicode_fractions(line)
+    text = _LEADING_NOISE_PATTERN.sub('', _PARENTHETICAL_PATTERN.sub(' ', text)).strip()
+
+    # Strip quantities and units until neither is left: '1 15-ounce can beans' -> 'beans'
+    quantities, units = [], []
+    while True:
+        progressed = False
+        match = _QUANTITY_PATTERN.match(text)
+        if match and match.group(0).strip():
+            quantities.append(' '.join(match.group(0).split()))
+            text = text[match.end():].lstrip(' -')
+            progressed = True
+        match = _UNIT_PATTERN.match(text) if quantities else None
+        # A unit word is the food itself when nothing follows it ('1 tsp cloves')
+        if match and text[match.end():].strip():
+            units.append(_UNIT_SUFFIX_PATTERN.sub('', text[:match.end()]))
+            text = text[match.end():]
+            progressed = True
+        if not progressed:
+            break
+    quantity = ' '.join(quantities) or None
+    unit = ' '.join(units) or None
+
+    # The name is the first segment that is more than descriptors: 'boneless, skinless chicken thighs'
+    name = ''
+    for segment in _TRAILING_PATTERN.split(text):
+        name = _NON_NAME_PATTERN.sub(' ', segment.lower())
+        name = _LEADING_DESCRIPTORS_PATTERN.sub('', ' '.join(name.split()))
+        name = _TRAILING_DESCRIPTORS_PATTERN.sub('', name)
+        name = _LEADING_OF_PATTERN.sub('', name).strip(" '-")
+        if name:
+            break
+
+    return quantity, unit, name
+
+
+def clean_ingredient(line):
+    """Return just the food name of an ingredient line, or '' if there is none or it is ignored (water)."""
+    name = parse_ingredient(line)[2]
+    return '' if name in IGNORED_INGREDIENTS else name
+
+
+def clean_ingredients(lines):
+    """Clean many ingredient lines into unique food names, keeping their first-seen order."""
+    names = (clean_ingredient(line) for line in lines)
+    return list(dict.fromkeys(name for name in names if name))
@@ -0,0 +1,37 @@
+import json
+from flask import Response, stream_with_context
+
+# Flush streamed JSON to the client in chunks of roughly this many characters
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def stream_json_array(conn, cursor, first_row=None, row_to_dict=dict):
+    """
+    Stream the rows of an executed cursor as a JSON array.
+
+    Rows are serialized one at a time as the cursor is iterated, so only the
+    current chunk is held in memory regardless of the result size. `first_row`
+    lets callers peek at the cursor (e.g. to return a 404 when it is empty)
+    without losing that row. The connection is closed when the stream ends.
+    """
+    def generate():
+        try:
+            buffer = ['[']
+            size = 1
+            row = first_row if first_row is not None else cursor.fetchone()
+            separator = ''
+            while row is not None:
+                element = separator + json.dumps(row_to_dict(row), separators=(',', ':'))
+                buffer.append(element)
+                size += len(element)
+                separator = ','
+                if size >= STREAM_CHUNK_SIZE:
+                    yield ''.join(buffer)
+                    buffer, size = [], 0
+                row = cursor.fetchone()
+            buffer.append(']')
+            yield ''.join(buffer)
+        finally:
+            conn.close()
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
@@ -0,0 +1,4 @@
+# Production entry point: gunicorn --config gunicorn.conf.py wsgi:app
+# Importing the app loads the FoodKeeper data and builds the lookup indexes; with
+# preload_app this happens once in the gunicorn master and workers share it after fork.
+from app import app
@@ -1,10 +1,23 @@
 const BACK_URL = 'http://localhost:5001/';
 const FRONT_URL = 'http://localhost:3000/';
 
-// Fetch groceries from inventory (GET request)
-export const getInventoryItems = async () => {
+// Columns the item tables render; the backend only returns these
+const ITEM_LIST_FIELDS = 'item_id,item_name,category,quantity,item_state,location';
+
+// Items requested per page; the Inventory and Grocery List pages load further pages on demand
+const ITEM_PAGE_SIZE = 100;
+
+// Build a query string for the item list endpoints (fields, filters, sort, limit, cursor)
+const itemListQuery = (params = {}) => {
+  const query = new URLSearchParams({ fields: ITEM_LIST_FIELDS, limit: ITEM_PAGE_SIZE, ...params });
+  return `?${query.toString()}`;
+};
+
+// Fetch groceries from inventory (GET request), one page at a time.
+// Returns { items, next_cursor }; pass next_cursor back as params.cursor for the next page.
+export const getInventoryItems = async (params) => {
   try {
-    const response = await fetch(`${BACK_URL}inventory_items`, {
+    const response = await fetch(`${BACK_URL}inventory_items${itemListQuery(params)}`, {
       method: 'GET',
       credentials: 'include',
     });
@@ -18,10 +31,10 @@ export const getInventoryItems = async () => {
   }
 };
 
-// Fetch groceries from grocery (GET request)
-export const getGroceryItems = async () => {
+// Fetch groceries from grocery (GET request), one page at a time like getInventoryItems
+export const getGroceryItems = async (params) => {
   try {
-    const response = await fetch(`${BACK_URL}grocery_items`, {
+    const response = await fetch(`${BACK_URL}grocery_items${itemListQuery(params)}`, {
       method: 'GET',
       credentials: 'include',
     });
@@ -348,3 +361,69 @@ export const fetchShelfLife = async (productName, location) => {
     return { error: "Could not retrieve shelf life data." };
   }
 };
+
+// Fetch shelf life data for many items in one request. Without items, the backend uses the user's inventory.
+export const fetchShelfLifeBatch = async (items) => {
+  try {
+    const response = await fetch(`${BACK_URL}shelf_life/batch`, {
+      method: 'POST',
+      credentials: 'include',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify(items ? { items } : {}),
+    });
+
+    if (!response.ok) {
+      throw new Error(`Error: ${response.statusText}`);
+    }
+
+    const data = await response.json();
+    return data.results || [];
+  } catch (error) {
+    console.error("Error fetching batch shelf life data:", error);
+    return [];
+  }
+};
+
+// Fetch inventory items expiring within the given number of days (GET request)
+export const getExpiringItems = async (days = 7) => {
+  try {
+    const response = await fetch(`${BACK_URL}expiring_items?days=${days}`, {
+      method: 'GET',
+      credentials: 'include',
+    });
+    if (!response.ok) {
+      throw new Error('Failed to fetch expiring items');
+    }
+    const data = await response.json();
+    return data.items || [];
+  } catch (error) {
+    console.error('Error fetching expiring items:', error);
+    return [];
+  }
+};
+
+// Apply many create/update/delete operations in one request and one transaction (POST request)
+export const batchItems = async (operations) => {
+  try {
+    const response = await fetch(`${BACK_URL}items/batch`, {
+      method: 'POST',
+      credentials: 'include',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ operations }),
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to apply item batch');
+    }
+
+    const data = await response.json();
+    return data.results || [];
+  } catch (error) {
+    console.error('Error applying item batch:', error);
+    throw error;
+  }
+};
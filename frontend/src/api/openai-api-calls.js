@@ -36,6 +36,38 @@ export const locateItem = async (itemName) => {
     }
 };
 
+// Used for an item the backend could not classify, so every item can still be saved
+const FALLBACK_CATEGORY = 'Household and Miscellaneous';
+const FALLBACK_LOCATION = 'Pantry';
+
+// Category and location for many items in one request, in the same order as itemNames.
+// Items the backend could not classify get the fallback category and location; a failed
+// request throws so the caller can report it instead of saving empty fields.
+export const classifyItems = async (itemNames) => {
+    try {
+        const response = await fetch(`${BACK_URL}classify_items`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ item_names: itemNames }),
+        });
+
+        if (!response.ok) {
+            throw new Error('Failed to classify items');
+        }
+
+        const data = await response.json();
+        const classifications = data.classifications || [];
+        return itemNames.map((itemName, index) => ({
+            category: classifications[index]?.category || FALLBACK_CATEGORY,
+            location: classifications[index]?.location || FALLBACK_LOCATION,
+        }));
+    } catch (error) {
+        console.error("Error classifying items:", error);
+        throw error;
+    }
+};
 
 export const cleanIngredients = async (ingredientsList) => {
     try {
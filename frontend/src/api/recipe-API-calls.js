@@ -334,7 +334,96 @@ export const fetchIngredients = async (title) => {
     }
   };
   
- const cleanIngredients = async (ingredientsList) => {
+/**
+ * Fetches the ingredient lines of many recipe titles in one request.
+ * The backend searches the titles concurrently and reports each one separately.
+ * @param {Array<string>} titles - Recipe titles.
+ * @returns {Promise<Object>} - Map of title to its first list of ingredient lines, or to null if it failed.
+ */
+export const fetchIngredientsBatch = async (titles) => {
+    try {
+      const response = await fetch(`${BACK_URL}fetch_ingredients_batch`, {
+        method: 'POST',
+        credentials: 'include',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ titles }),
+      });
+
+      if (!response.ok) throw new Error('Failed to fetch ingredients');
+
+      const data = await response.json();
+      return Object.fromEntries(
+        (data.results || []).map(result => [
+          result.title,
+          result.status === 200 ? result.ingredientLines[0] || [] : null,
+        ])
+      );
+    } catch (error) {
+      console.error('Error fetching ingredients batch:', error);
+      return {};
+    }
+  };
+
+/**
+ * Ranks recipes by how much of each can be cooked from the user's inventory.
+ * @param {Array<Object>} recipes - Searched recipes ({ title, link, ingredients? }); saved recipes are included by the backend.
+ * @param {number} [limit] - Maximum number of ranked recipes to return.
+ * @returns {Promise<Object>} - { recipes: [{ title, coverage, missing, ... }], unresolved: [...] }.
+ */
+export const fetchRecipeCoverage = async (recipes = [], limit) => {
+    try {
+      const response = await fetch(`${BACK_URL}recipe_coverage`, {
+        method: 'POST',
+        credentials: 'include',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(limit ? { recipes, limit } : { recipes }),
+      });
+
+      if (!response.ok) throw new Error('Failed to rank recipes');
+
+      return await response.json();
+    } catch (error) {
+      console.error('Error ranking recipes by coverage:', error);
+      return { recipes: [], unresolved: [] };
+    }
+  };
+
+/**
+ * Adds the ingredients of one or more recipes that are not already in the inventory
+ * or on the grocery list to the grocery list, in a single request.
+ * @param {Array<string>} titles - Recipe titles.
+ * @returns {Promise<Object>} - { added: [items], already_have: [names], unresolved: [...] }.
+ */
+export const createShoppingListFromRecipes = async (titles) => {
+    try {
+      const response = await fetch(`${BACK_URL}shopping_list_from_recipes`, {
+        method: 'POST',
+        credentials: 'include',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ titles }),
+      });
+
+      if (!response.ok) throw new Error('Failed to add recipe ingredients to the grocery list');
+
+      return await response.json();
+    } catch (error) {
+      console.error('Error building shopping list from recipes:', error);
+      return { added: [], already_have: [], unresolved: [] };
+    }
+  };
+
+/**
+ * Cleans raw ingredient lines into plain food names.
+ * @param {Array<string>} ingredientsList - Raw ingredient lines.
+ * @returns {Promise<Array<string>>} - Cleaned ingredient names.
+ */
+export const cleanIngredients = async (ingredientsList) => {
     try {
         const response = await fetch(`${BACK_URL}clean_ingredients`, { 
             method: 'POST',
@@ -1,6 +1,6 @@
 import React, { useState } from 'react';
-import { addGroceryItem } from '/src/api/grocery-API-calls';
-import { categorizeItem, locateItem } from '/src/api/openai-api-calls.js';
+import { batchItems } from '/src/api/grocery-API-calls';
+import { classifyItems } from '/src/api/openai-api-calls.js';
 
 const GroceryForm = ({ onSubmit }) => {
   const [groceryItems, setGroceryItems] = useState([]);
@@ -35,9 +35,14 @@ const GroceryForm = ({ onSubmit }) => {
       return;
     }
 
-    const category = await categorizeItem(newItem.item_name);
-    const location = await locateItem(newItem.item_name);
-    
+    let category, location;
+    try {
+      [{ category, location }] = await classifyItems([newItem.item_name]);
+    } catch (error) {
+      setErrorMessage("❌ Could not categorize the item. Please try again.");
+      return;
+    }
+
     const newItemToAdd = {
       ...newItem,
       item_id: groceryItems.length + 1,
@@ -59,9 +64,12 @@ const GroceryForm = ({ onSubmit }) => {
     }
 
     try {
-      const newItems = await Promise.all(groceryItems.map(async (item) => {
-        return await addGroceryItem(item);
-      }));
+      // Create every item in one request; in_list = 1 puts them on the grocery list
+      const results = await batchItems(groceryItems.map(({ item_id, ...item }) => ({
+        op: 'create',
+        item: { ...item, in_list: 1 },
+      })));
+      const newItems = results.map(result => result.item);
       onSubmit(newItems); // Transfer items to GroceryList
       setGroceryItems([]); // Clear form items
       alert("Grocery items submitted successfully!");
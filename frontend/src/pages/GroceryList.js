@@ -1,7 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import GroceryForm from './GroceryForm';
 import { getGroceryItems, addGroceryItem, deleteGroceryItem, updateGroceryItem, transferGroceryToInventory } from '/src/api/grocery-API-calls';
-import { categorizeItem, locateItem } from '/src/api/openai-api-calls.js';
+import { classifyItems } from '/src/api/openai-api-calls.js';
 
 const GroceryList = () => {
     const [firstName, setFirstName] = useState('');
@@ -18,6 +18,7 @@ const GroceryList = () => {
     const [selectedCategory, setSelectedCategory] = useState('All');
     const [selectedLocation, setSelectedLocation] = useState('All');
     const [selectedItems, setSelectedItems] = useState([]); 
+    const [nextCursor, setNextCursor] = useState(null);
 
     const [newItem, setNewItem] = useState({ item_name: '', category: '', quantity: '', location: '' });
 
@@ -35,13 +36,25 @@ const GroceryList = () => {
 
     const fetchGroceries = async () => {
         try {
-            const items = await getGroceryItems();
-            setGroceryItems(items ? items.map(item => ({ ...item, selected: false })) : []);
+            const page = await getGroceryItems();
+            setGroceryItems(page ? page.items.map(item => ({ ...item, selected: false })) : []);
+            setNextCursor(page ? page.next_cursor : null);
         } catch (error) {
             setErrorMessage('❌ Failed to load items. Please try again later.');
         }
     };
 
+    // Append the next page of the grocery list below the rows already shown
+    const loadMoreGroceries = async () => {
+        const page = await getGroceryItems({ cursor: nextCursor });
+        if (!page) {
+            setErrorMessage('❌ Failed to load more items. Please try again later.');
+            return;
+        }
+        setGroceryItems(prevItems => [...prevItems, ...page.items.map(item => ({ ...item, selected: false }))]);
+        setNextCursor(page.next_cursor);
+    };
+
     const handleDeleteItem = async (item_id) => {
         try {
             await deleteGroceryItem(item_id);
@@ -72,9 +85,14 @@ const GroceryList = () => {
             return;
         }
 
-        const category = await categorizeItem(newItem.item_name);
-        const location = await locateItem(newItem.item_name);
-        
+        let category, location;
+        try {
+            [{ category, location }] = await classifyItems([newItem.item_name]);
+        } catch (error) {
+            setErrorMessage("❌ Could not categorize the item. Please try again.");
+            return;
+        }
+
         const newItemToAdd = {
             ...newItem,
             item_id: groceryItems.length + 1,
@@ -430,6 +448,13 @@ const GroceryList = () => {
                         </tbody>
                     </table>
                 </div>
+                {nextCursor && (
+                    <div className="grocery-add-submit">
+                        <button onClick={loadMoreGroceries} className="grocery-submit-button">
+                            Load more
+                        </button>
+                    </div>
+                )}
             </div>
 
             {groceryItems.some(item => item.selected) && (
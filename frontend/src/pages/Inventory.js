@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
-import { getInventoryItems, addGroceryItem, deleteInventoryItem, updateGroceryItem, checkLoginStatus, updateItemInList, fetchShelfLife} from '/src/api/grocery-API-calls';
-import { categorizeItem, locateItem } from '/src/api/openai-api-calls.js';
+import { getInventoryItems, addGroceryItem, deleteInventoryItem, updateGroceryItem, checkLoginStatus, updateItemInList, fetchShelfLife, fetchShelfLifeBatch, getExpiringItems} from '/src/api/grocery-API-calls';
+import { classifyItems } from '/src/api/openai-api-calls.js';
 
 const Inventory = () => {
   const [groceryItems, setGroceryItems] = useState([]);
@@ -22,6 +22,9 @@ const Inventory = () => {
 
   const [shelfLifeData, setShelfLifeData] = useState(null);
   const [hoveredItemId, setHoveredItemId] = useState(null);
+  const [shelfLifeCache, setShelfLifeCache] = useState({});
+  const [expiringItems, setExpiringItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
 
   useEffect(() => {
     checkLoginStatus();
@@ -35,12 +38,15 @@ const Inventory = () => {
   const fetchItems = async () => {
     try {
         const data = await getInventoryItems(); 
-        if (Array.isArray(data)) {
-            const updatedData = data.map(item => ({
+        if (data && Array.isArray(data.items)) {
+            const updatedData = data.items.map(item => ({
                 ...item,
                 item_state: item.item_state || 'High', // Default to 'High' if not set
             }));
             setGroceryItems(updatedData); 
+            setNextCursor(data.next_cursor);
+            prefetchShelfLife();
+            getExpiringItems().then(setExpiringItems);
         } else {
             setGroceryItems([]);
             console.error('Unexpected data format:', data);
@@ -51,6 +57,41 @@ const Inventory = () => {
     }
 };
 
+  // Append the next page of the inventory below the rows already shown
+  const loadMoreItems = async () => {
+    const data = await getInventoryItems({ cursor: nextCursor });
+    if (data && Array.isArray(data.items)) {
+        const updatedData = data.items.map(item => ({
+            ...item,
+            item_state: item.item_state || 'High',
+        }));
+        setGroceryItems(prevItems => [...prevItems, ...updatedData]);
+        setNextCursor(data.next_cursor);
+    } else {
+        setErrorMessage('Failed to load more items. Please try again.');
+    }
+  };
+
+  // Shape a batch result like the single-item fetchShelfLife response
+  const toShelfLifeResponse = (result) => {
+    if (typeof result === 'string') return { message: result };
+    if (result.message || result.error) return { message: result.message || result.error };
+    if (result.options) return { options: result.options };
+    return { shelfLife: result };
+  };
+
+  // Load shelf life data for the whole inventory in one request
+  const prefetchShelfLife = async () => {
+    const results = await fetchShelfLifeBatch();
+    const cache = {};
+    results.forEach(entry => {
+      if (entry.item_id !== undefined) {
+        cache[`${entry.item_id}:${entry.location}`] = entry.result;
+      }
+    });
+    setShelfLifeCache(cache);
+  };
+
   const handleCheckboxChange = (item_id) => {
     setSelectedItems((prevSelectedItems) => {
         const newSelectedItems = prevSelectedItems.includes(item_id)
@@ -146,8 +187,7 @@ const setErrorWithTimer = (message, duration = 3000) => {
 
     try {
         // Categorize and locate the item
-        const category = await categorizeItem(item_name);
-        const location = await locateItem(item_name);
+        const [{ category, location }] = await classifyItems([item_name]);
 
         // Add the new item to the inventory
         const newItemWithCategoryandLocation = { ...newItem, category, location };
@@ -269,7 +309,10 @@ const setErrorWithTimer = (message, duration = 3000) => {
   const getShelfLifeInfo = async (itemName, itemId, location) => {
     try {
       setShelfLifeData(null); // Clear previous data
-      const response = await fetchShelfLife(itemName, location);
+      const cached = shelfLifeCache[`${itemId}:${String(location).toLowerCase()}`];
+      const response = cached !== undefined
+        ? toShelfLifeResponse(cached)
+        : await fetchShelfLife(itemName, location);
   
       if (response.message) {
         // Handle single message (e.g., "Not recommended to store in fridge")
@@ -297,6 +340,11 @@ const setErrorWithTimer = (message, duration = 3000) => {
         <div className="inventory-welcome">
           <h1>Welcome to your current inventory, {firstName}!</h1>
           {errorMessage && <div className="error-message-wrap"><div className="error-message">{errorMessage}</div></div>}
+          {expiringItems.length > 0 && (
+            <div className="expiring-items">
+              Expiring soon: {expiringItems.map(item => `${item.item_name} (${item.expires_min})`).join(', ')}
+            </div>
+          )}
         </div>
 
         <div className="inventory-options-and-table">
@@ -551,6 +599,11 @@ const setErrorWithTimer = (message, duration = 3000) => {
             </tbody>
           </table>
         </div>
+        {nextCursor && (
+          <div className="inventory-add-submit">
+            <button onClick={loadMoreItems}>Load more</button>
+          </div>
+        )}
         <div className="inventory-add-submit">
           {anySelected && (
             <button onClick={checkboxSubmit}>Submit Selected</button>
@@ -2,6 +2,8 @@ import React, { useState, useEffect } from 'react';
 import {
     sendMealsToBackend,
     fetchIngredients, 
+    fetchIngredientsBatch,
+    cleanIngredients,
     handleDeleteRecipe // Fetch ingredients by recipe title
 } from '/src/api/recipe-API-calls';
 import { getInventoryItems } from '/src/api/grocery-API-calls';
@@ -15,6 +17,7 @@ const Recipes = () => {
     const [favoritedRecipes, setFavoritedRecipes] = useState([]);
     const [hoveredLink, setHoveredLink] = useState(null);
     const [mousePosition, setMousePosition] = useState({ x: 0, y: 0 });
+    const [ingredientLines, setIngredientLines] = useState({});
     const BACK_URL = 'http://localhost:5001/';
 
     // Fetch user's first name
@@ -28,6 +31,19 @@ const Recipes = () => {
         fetchInventory();
     }, []);
 
+    // Prefetch the ingredient lines of every listed recipe with one batch request
+    useEffect(() => {
+        const titles = [...recipes, ...savedRecipes, ...favoritedRecipes]
+            .map(recipe => recipe.title)
+            .filter(title => title && !(title in ingredientLines));
+        const uniqueTitles = [...new Set(titles)].slice(0, 50);
+        if (uniqueTitles.length === 0) return;
+
+        fetchIngredientsBatch(uniqueTitles).then(linesByTitle => {
+            setIngredientLines(prev => ({ ...prev, ...linesByTitle }));
+        });
+    }, [recipes, savedRecipes, favoritedRecipes]);
+
     // Fetch saved recipes
     const fetchSavedRecipes = async () => {
         const token = localStorage.getItem('token');
@@ -71,8 +87,9 @@ const Recipes = () => {
     // Fetch inventory items
     const fetchInventory = async () => {
         try {
-            const items = await getInventoryItems();
-            setInventoryItems(items || []);
+            // The first page is plenty to search recipes with
+            const page = await getInventoryItems();
+            setInventoryItems(page ? page.items : []);
         } catch (error) {
             console.error('Error fetching inventory items:', error);
         }
@@ -132,7 +149,11 @@ const Recipes = () => {
 
     const handleCookNow = async title => {
         try {
-            const recipeIngredients = await fetchIngredients(title);
+            // Use the prefetched lines when available, otherwise fetch this title alone
+            const prefetchedLines = ingredientLines[title];
+            const recipeIngredients = prefetchedLines
+                ? await cleanIngredients(prefetchedLines)
+                : await fetchIngredients(title);
             const missing = calculateMissingIngredients(recipeIngredients, inventoryItems);
             if (missing.length > 0) {
                 alert(`Missing Ingredients for "${title}":\n${missing.join('\n')}`);